@@ -3,10 +3,8 @@ import pandas as pd
 from datetime import datetime
 import time
 import traceback
-import re
 import base64
-from io import BytesIO
-from scraper import ProductScraper
+from scraper import ProductScraper, get_shared_core
 import logging
 import threading
 
@@ -207,7 +205,8 @@ st.markdown("""
 
 # Initialize session state
 if 'scraper' not in st.session_state:
-    st.session_state.scraper = ProductScraper()
+    # Caches, connection pool and domain catalog shared by every browser session, the CLI and workers
+    st.session_state.scraper = ProductScraper(core=get_shared_core())
 if 'current_page' not in st.session_state:
     st.session_state.current_page = 'home'
 if 'selected_category' not in st.session_state:
@@ -394,24 +393,6 @@ if st.session_state.search_history:
     for search in st.session_state.search_history[-3:]:
         st.sidebar.markdown(f"• {search}")
 
-# Progress callback function
-def update_progress_display(progress_info):
-    """Update progress display in real-time"""
-    if 'progress_container' in st.session_state:
-        with st.session_state.progress_container:
-            if progress_info['status'] == 'searching':
-                st.info(f"🔍 {progress_info['message']}")
-                if progress_info['search_total'] > 0:
-                    progress = progress_info['search_completed'] / progress_info['search_total']
-                    st.progress(progress)
-            elif progress_info['status'] == 'scraping':
-                st.info(f"🔄 {progress_info['message']}")
-                if progress_info['scrape_total'] > 0:
-                    progress = progress_info['scrape_completed'] / progress_info['scrape_total']
-                    st.progress(progress)
-            elif progress_info['error']:
-                st.error(f"❌ Error: {progress_info['error']}")
-
 # Main content
 if st.session_state.current_page == 'home':
     st.markdown('<h1 class="main-header">🔍 SmartScrape Pro Ultimate</h1>', unsafe_allow_html=True)
@@ -623,9 +604,6 @@ elif st.session_state.current_page == 'scraping':
     # Create containers for real-time updates
     status_container = st.container()
     progress_container = st.container()
-    
-    # Store progress container in session state for callback
-    st.session_state.progress_container = progress_container
 
     with status_container:
         status_text = st.empty()
@@ -650,14 +628,38 @@ elif st.session_state.current_page == 'scraping':
             with progress_container:
                 initial_progress = st.progress(0)
                 initial_status = st.info("🔍 Initializing search...")
+                live_results = st.empty()
             
-            # Perform the enhanced search and scraping
-            products = st.session_state.scraper.search_and_scrape_enhanced(
+            # Search and scrape as one pipeline, rendering products as they arrive
+            products = []
+            last_render = 0
+            for product in st.session_state.scraper.iter_search_and_scrape(
                 query=query,
                 category=category,
                 max_results=max_results,
-                progress_callback=update_progress_display
-            )
+                max_workers=parallel_workers
+            ):
+                products.append(product)
+                
+                # Redraw at most a few times per second
+                if time.time() - last_render < 0.5:
+                    continue
+                last_render = time.time()
+                
+                progress_info = st.session_state.scraper.get_progress()
+                if progress_info['scrape_total'] > 0:
+                    initial_progress.progress(min(progress_info['scrape_completed'] / progress_info['scrape_total'], 1.0))
+                initial_status.info(f"🔄 {len(products)} products scraped - {progress_info['message']}")
+                live_results.dataframe(
+                    pd.DataFrame([
+                        {'Name': p['name'][:60], 'Price': p['price'], 'Site': p['domain']}
+                        for p in reversed(products[-10:])
+                    ]),
+                    use_container_width=True,
+                    hide_index=True
+                )
+            
+            initial_progress.progress(1.0)
             
             # Update final status
             with progress_container:
@@ -790,7 +792,7 @@ elif st.session_state.current_page == 'results':
         with col1:
             price_filter = st.selectbox("Price:", ["All", "With Price Only", "No Price"])
         with col2:
-            availability_filter = st.selectbox("Availability:", ["All", "In Stock", "Out of Stock", "Limited Stock", "Unknown"])
+            availability_filter = st.selectbox("Availability:", ["All", "In Stock", "Out of Stock", "Limited Stock", "Pre-order", "Backorder", "Unknown"])
         with col3:
             region_filter = st.selectbox("Region:", ["All"] + list(set(p.get('region', 'unknown') for p in st.session_state.scraped_data)))
         with col4:
@@ -813,34 +815,28 @@ elif st.session_state.current_page == 'results':
         # Sort results
         if sort_by.startswith("Price") and filtered_data:
             def extract_price_value(product):
-                price_str = product['price']
-                if price_str == "Price not found":
+                price_amount = product.get('price_amount')
+                if price_amount is None:
                     return float('inf') if "Low to High" in sort_by else 0
-                
-                numbers = re.findall(r'[\d,]+\.?\d*', price_str.replace(',', ''))
-                if numbers:
-                    try:
-                        return float(numbers[0])
-                    except:
-                        return float('inf') if "Low to High" in sort_by else 0
-                return float('inf') if "Low to High" in sort_by else 0
+                return price_amount
             
             filtered_data.sort(key=extract_price_value, reverse="High to Low" in sort_by)
         
         elif sort_by == "Rating (High to Low)":
-            def extract_rating_value(product):
-                rating_str = product.get('rating', 'No rating')
-                if rating_str == "No rating":
-                    return 0
-                rating_match = re.search(r'(\d+(?:\.\d+)?)', rating_str)
-                return float(rating_match.group(1)) if rating_match else 0
-            
-            filtered_data.sort(key=extract_rating_value, reverse=True)
+            filtered_data.sort(key=lambda product: product.get('rating_value', 0), reverse=True)
+        
+        # Display products with enhanced cards, a page at a time
+        page_size = 20
+        page_count = max(1, (len(filtered_data) + page_size - 1) // page_size)
+        page = st.number_input("Page:", min_value=1, max_value=page_count, value=1, step=1) if page_count > 1 else 1
+        page_start = (page - 1) * page_size
+        page_products = filtered_data[page_start:page_start + page_size]
+        st.markdown(f"### Showing {page_start + 1 if page_products else 0}-{page_start + len(page_products)} of {len(filtered_data)} products")
         
-        # Display products with enhanced cards
-        st.markdown(f"### Showing {len(filtered_data)} products")
+        # Start the downloads for the visible cards only; each card then waits just for its own
+        st.session_state.scraper.prefetch_images(page_products)
         
-        for i, product in enumerate(filtered_data):
+        for i, product in enumerate(page_products, start=page_start):
             with st.container():
                 st.markdown('<div class="product-card">', unsafe_allow_html=True)
                 
@@ -880,8 +876,9 @@ elif st.session_state.current_page == 'results':
                     # Enhanced image display
                     if product.get('image_url'):
                         try:
-                            if product.get('image_data'):
-                                st.image(BytesIO(product['image_data']), width=150, caption="Product Image")
+                            image_path = st.session_state.scraper.get_image_path(product)
+                            if image_path:
+                                st.image(image_path, width=150, caption="Product Image")
                             else:
                                 st.image(product['image_url'], width=150, caption="Product Image")
                         except Exception as e:
@@ -907,7 +904,7 @@ elif st.session_state.current_page == 'results':
         
         with col1:
             if st.button("📥 Export to CSV", use_container_width=True):
-                df = pd.DataFrame(filtered_data)
+                df = pd.DataFrame([product.to_dict() for product in filtered_data])
                 csv = df.to_csv(index=False)
                 st.download_button(
                     label="Download CSV",
@@ -944,15 +941,7 @@ elif st.session_state.current_page == 'analytics' and PLOTLY_AVAILABLE:
         data = st.session_state.scraped_data
         
         # Price analysis
-        valid_prices = []
-        for product in data:
-            if product['price'] != "Price not found":
-                price_match = re.search(r'[\d,]+\.?\d*', product['price'].replace(',', ''))
-                if price_match:
-                    try:
-                        valid_prices.append(float(price_match.group()))
-                    except:
-                        continue
+        valid_prices = [p['price_amount'] for p in data if p.get('price_amount') is not None]
         
         if valid_prices:
             col1, col2 = st.columns(2)
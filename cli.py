@@ -0,0 +1,261 @@
+"""Headless batch mode: scrape every query in a file and stream the products to JSONL or Parquet.
+
+    python cli.py queries.txt -o products.jsonl
+    python cli.py queries.txt -o products.parquet --concurrency 4 --max-results 50
+
+All queries share one pool of scraping workers, and a page found by several
+queries is scraped once. Finished queries are recorded in a checkpoint file next
+to the output, so running the same command again after an interruption only runs
+what is left. Products already in the output are never written twice.
+"""
+import argparse
+import json
+import logging
+import os
+import signal
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List
+
+from scraper import DEFAULT_CACHE_DIR, FETCH_ENGINES, Product, ProductScraper, get_shared_core
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('jsonl', 'parquet')
+# Every output record is a product plus the query that found it and when
+RECORD_FIELDS = ('query',) + Product.__slots__ + ('scraped_at',)
+NUMERIC_FIELDS = ('price_amount', 'rating_value')
+
+
+def read_queries(path: str) -> List[str]:
+    """Queries from a file, one per line. Blank lines, # comments and repeats are skipped"""
+    queries = []
+    seen = set()
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            query = line.strip()
+            if query and not query.startswith('#') and query not in seen:
+                seen.add(query)
+                queries.append(query)
+    return queries
+
+
+class Checkpoint:
+    """Finished queries, persisted as JSON and rewritten atomically after each one"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.completed = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.completed = set(json.load(f).get('completed', []))
+
+    def __contains__(self, query: str) -> bool:
+        return query in self.completed
+
+    def mark_done(self, query: str):
+        with self._lock:
+            self.completed.add(query)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'completed': sorted(self.completed), 'updated_at': datetime.now().isoformat()}, f, indent=1)
+            os.replace(tmp_path, self.path)
+
+
+class JSONLSink:
+    """Appends one JSON object per product, flushed line by line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.seen = set()  # (query, product_url) already in the file
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._load_existing()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load_existing(self):
+        valid_bytes = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Cut short by an interruption
+                valid_bytes += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                self.seen.add((record.get('query'), record.get('product_url')))
+
+        # Drop a partial last line so appended records start on a line of their own
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_bytes)
+
+    def write(self, record: Dict) -> bool:
+        """Write a record unless its product is already in the output for the same query"""
+        key = (record['query'], record['product_url'])
+        with self._lock:
+            if key in self.seen:
+                return False
+            self.seen.add(key)
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+        return True
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ParquetSink:
+    """Writes products into a directory of Parquet part files.
+
+    Every flush writes one complete part and renames it into place, so an interrupted
+    run never leaves a half-written file behind. A resumed run adds new parts.
+    """
+
+    def __init__(self, path: str, rows_per_part: int = 1000):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("Parquet output needs pyarrow. Install with: pip install pyarrow")
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self.schema = pa.schema([(field, pa.float64() if field in NUMERIC_FIELDS else pa.string()) for field in RECORD_FIELDS])
+        self.seen = set()  # (query, product_url) already in the dataset
+        self._rows = []
+        self._run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self._parts = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(path, exist_ok=True)
+        for name in sorted(os.listdir(path)):
+            if name.endswith('.parquet'):
+                table = pq.read_table(os.path.join(path, name), columns=['query', 'product_url'])
+                self.seen.update(zip(table.column('query').to_pylist(), table.column('product_url').to_pylist()))
+
+    def write(self, record: Dict) -> bool:
+        """Buffer a record unless its product is already in the output for the same query"""
+        key = (record['query'], record['product_url'])
+        with self._lock:
+            if key in self.seen:
+                return False
+            self.seen.add(key)
+            self._rows.append(record)
+            if len(self._rows) >= self.rows_per_part:
+                self._write_part()
+        return True
+
+    def flush(self):
+        with self._lock:
+            self._write_part()
+
+    def close(self):
+        self.flush()
+
+    def _write_part(self):
+        if not self._rows:
+            return
+        self._parts += 1
+        part_path = os.path.join(self.path, f"part-{self._run_id}-{self._parts:05d}.parquet")
+        pq.write_table(pa.Table.from_pylist(self._rows, schema=self.schema), f"{part_path}.tmp")
+        os.replace(f"{part_path}.tmp", part_path)
+        self._rows = []
+
+
+def open_sink(path: str, output_format: str):
+    if output_format == 'parquet':
+        return ParquetSink(path)
+    return JSONLSink(path)
+
+
+def _stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scrape a file of search queries and stream the products to JSONL or Parquet.")
+    parser.add_argument('queries', help="file with one search query per line")
+    parser.add_argument('-o', '--output', required=True, help="output file (JSONL) or directory (Parquet)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS,
+                        help="output format (default: parquet for a .parquet output, jsonl otherwise)")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help="queries searched at the same time (default: 4)")
+    parser.add_argument('-w', '--workers', type=int, default=8, help="scraping workers shared by all queries (default: 8)")
+    parser.add_argument('-n', '--max-results', type=int, default=100, help="search results per query (default: 100)")
+    parser.add_argument('--category', default='general', help="product category for every query (default: general)")
+    parser.add_argument('--fetch-engine', choices=FETCH_ENGINES, default='threads')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f"cache directory (default: {DEFAULT_CACHE_DIR})")
+    parser.add_argument('--no-cache', action='store_true', help="do not read or write the on-disk caches")
+    parser.add_argument('--checkpoint', help="checkpoint file (default: <output>.checkpoint.json)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only log warnings and errors")
+    args = parser.parse_args(argv)
+
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+    output_format = args.format or ('parquet' if args.output.endswith('.parquet') else 'jsonl')
+
+    queries = read_queries(args.queries)
+    checkpoint = Checkpoint(args.checkpoint or f"{args.output.rstrip(os.sep)}.checkpoint.json")
+    pending = [query for query in queries if query not in checkpoint]
+    logger.info(f"{len(queries)} queries, {len(queries) - len(pending)} already done, {len(pending)} to run")
+    if not pending:
+        return 0
+
+    try:
+        sink = open_sink(args.output, output_format)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 2
+
+    scraper = ProductScraper(fetch_engine=args.fetch_engine, core=get_shared_core(None if args.no_cache else args.cache_dir))
+    scraper.image_mode = 'lazy'  # Only image URLs are exported
+    scraper.batch_search_concurrency = max(1, args.concurrency)
+    written = Counter()
+
+    def query_done(query: str):
+        # Products reach the output before the checkpoint says the query is done
+        sink.flush()
+        checkpoint.mark_done(query)
+        logger.info(f"[{len(checkpoint.completed)}/{len(queries)}] '{query}': {written[query]} products")
+
+    # cron and timeout(1) stop jobs with SIGTERM; stop the same way as on Ctrl+C
+    signal.signal(signal.SIGTERM, _stop)
+
+    status = 0
+    products = scraper.iter_batch_search_and_scrape(pending, args.category, args.max_results,
+                                                    max_workers=args.workers, query_callback=query_done)
+    try:
+        for query, product in products:
+            record = dict(product.to_dict(), query=query, scraped_at=datetime.now().isoformat(timespec='seconds'))
+            if sink.write(record):
+                written[query] += 1
+    except KeyboardInterrupt:
+        status = 130
+    except Exception as e:
+        logger.error(f"Batch failed: {e}")
+        status = 1
+    finally:
+        products.close()
+        sink.close()
+
+    remaining = len(queries) - len(checkpoint.completed)
+    logger.info(f"Wrote {sum(written.values())} products to {args.output}; {remaining} queries left")
+    if remaining and status:
+        logger.info("Run the same command again to resume")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,15 @@
+#!/bin/sh
+# Headless batch scrape, e.g. from cron:
+#   0 3 * * * /path/to/SmartScrape/run_scraper.sh queries.txt products.jsonl --concurrency 4
+# An interrupted run resumes from the checkpoint next to the output when started again.
+# Extra arguments go to cli.py, see: python cli.py --help
+
+cd "$(dirname "$0")" || exit 1
+[ -f venv/bin/activate ] && . venv/bin/activate
+
+QUERIES="${1:-queries.txt}"
+OUTPUT="${2:-products.jsonl}"
+[ $# -gt 0 ] && shift
+[ $# -gt 0 ] && shift
+
+exec python cli.py "$QUERIES" -o "$OUTPUT" "$@"
@@ -1,29 +1,1837 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from requests.compat import chardet
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+import bs4
+from bs4 import BeautifulSoup, Tag
 import re
 import time
-import random
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urljoin, urlparse, urlsplit, urlunsplit, parse_qsl, urlencode
 from duckduckgo_search import DDGS
 import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
 import threading
-from typing import List, Dict, Optional, Set, Tuple
+import queue
+from typing import List, Dict, Optional, Set, Tuple, Iterable, Iterator
 import json
+import html as html_lib
+import codecs
+from html.parser import HTMLParser
 import logging
 from io import BytesIO
 from PIL import Image
 import csv
 import os
 import io
+import asyncio
+import socket
+import sys
+import sqlite3
+import hashlib
+import tempfile
+import inspect
+from email.utils import parsedate_to_datetime
+from decimal import Decimal, InvalidOperation
+from contextlib import contextmanager, asynccontextmanager
+from collections import deque, OrderedDict
+from itertools import islice
+
+# Optional aiohttp import for the asyncio fetch engine
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+# Optional lxml import for the fast parsing backend
+try:
+    import lxml.html
+    from lxml import etree
+    from lxml.cssselect import CSSSelector
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class ProductScraper:
+FETCH_ENGINES = ('threads', 'asyncio')
+PARSER_BACKENDS = ('html.parser', 'lxml')
+IMAGE_MODES = ('lazy', 'prefetch', 'inline')
+# Bump when extraction output changes in ways the source fingerprint cannot see
+EXTRACTOR_VERSION = 2
+# Politeness key shared by every DuckDuckGo query, whichever backend DDGS picks
+DDGS_HOST = 'duckduckgo.com'
+DDGS_RATE_KEY = f'https://{DDGS_HOST}/'
+
+DOMAIN_CATALOG_URL = "https://hebbkx1anhila5yf.public.blob.vercel-storage.com/global_ecommerce_domains_extended-tkAgUrtheYUbHJAxoo6imNFJsbmvKA.csv"
+# Catalog CSV shipped with the code, used offline and until the first download succeeds
+DOMAIN_CATALOG_SEED = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'domain_catalog_seed.csv')
+# Search regions for the catalog's region names; other regions use their language code
+CATALOG_REGION_CODES = {
+    'North America': 'us-en',
+    'Europe': 'uk-en',
+    'South Asia': 'in-en',
+    'East Asia': 'jp-jp',
+    'Middle East': 'ae-en',
+    'Latin America': 'br-pt',
+    'Africa': 'za-en',
+    'Oceania': 'au-en'
+}
+
+DEFAULT_CACHE_DIR = os.environ.get('SMARTSCRAPE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'smartscrape'))
+
+class ConnectionStats:
+    """Thread-safe counters for requests sent versus TCP connections opened"""
+    
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+    
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+    
+    def record_connection(self):
+        with self._lock:
+            self.new_connections += 1
+    
+    def snapshot(self) -> Dict:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                'requests': self.requests,
+                'new_connections': self.new_connections,
+                'reused_connections': reused,
+                'reuse_ratio': reused / self.requests if self.requests else 0.0
+            }
+
+
+class DNSCache:
+    """Bounded LRU cache of host name lookups for the scraper's own HTTP connections.
+
+    Only connections opened through a PooledHTTPAdapter use it; the rest of the
+    process resolves names as usual. getaddrinfo does not report record TTLs, so
+    entries are kept for a short fixed ttl.
+    """
+    
+    def __init__(self, ttl: float = 60, max_entries: int = 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries = OrderedDict()  # (host, port) -> (expires_at, addresses)
+        self._lock = threading.Lock()
+    
+    def resolve(self, host: str, port: int) -> List[str]:
+        """Addresses of host in getaddrinfo order. Raises socket.gaierror like getaddrinfo"""
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry[1]
+            self.stats['misses'] += 1
+        
+        addresses = []
+        for _, _, _, _, sockaddr in socket.getaddrinfo(host, port, allowed_gai_family(), socket.SOCK_STREAM):
+            if sockaddr[0] not in addresses:
+                addresses.append(sockaddr[0])
+        with self._lock:
+            self._entries[key] = (now + self.ttl, addresses)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return addresses
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+class CachedDNSConnectionMixin:
+    """Opens the socket to addresses from a DNSCache instead of resolving the host each time"""
+    dns_cache = None
+    
+    def _new_conn(self):
+        host = self._dns_host
+        try:
+            addresses = self.dns_cache.resolve(host, self.port)
+        except OSError:
+            return super()._new_conn()  # Resolve again so urllib3 reports the failure its usual way
+        
+        error = None
+        for address in addresses:
+            # TLS is set up after this returns, with the host name back in place for SNI and certificate checks
+            self._dns_host = address
+            try:
+                return super()._new_conn()
+            except (NewConnectionError, ConnectTimeoutError) as e:
+                error = e
+            finally:
+                self._dns_host = host
+        if error is None:
+            return super()._new_conn()
+        raise error
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools report new connections to a ConnectionStats
+    and, given a DNSCache, resolve host names through it"""
+    
+    def __init__(self, stats: ConnectionStats, dns_cache: Optional[DNSCache] = None, **kwargs):
+        # Must be set before HTTPAdapter.__init__ calls init_poolmanager
+        self.stats = stats
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+    
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        stats = self.stats
+        resolver = self.dns_cache
+        
+        class CachedDNSHTTPConnection(CachedDNSConnectionMixin, HTTPConnection):
+            dns_cache = resolver
+        
+        class CachedDNSHTTPSConnection(CachedDNSConnectionMixin, HTTPSConnection):
+            dns_cache = resolver
+        
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            if resolver is not None:
+                ConnectionCls = CachedDNSHTTPConnection
+            
+            def _new_conn(self):
+                stats.record_connection()
+                return super()._new_conn()
+        
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            if resolver is not None:
+                ConnectionCls = CachedDNSHTTPSConnection
+            
+            def _new_conn(self):
+                stats.record_connection()
+                return super()._new_conn()
+        
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool
+        }
+    
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+class SessionPool:
+    """Per-thread requests sessions sharing one process-wide connection pool.
+
+    Sessions (cookies, headers) are thread-local because requests.Session is not
+    thread-safe, while the mounted adapter - and therefore its keep-alive
+    connections - is shared, so connections outlive short-lived worker threads.
+    """
+    
+    def __init__(self, headers: Dict[str, str], pool_connections: int = 256, pool_maxsize: int = 32,
+                 dns_cache_ttl: Optional[float] = 60):
+        self.headers = dict(headers)
+        self.stats = ConnectionStats()
+        self.dns_cache = DNSCache(dns_cache_ttl) if dns_cache_ttl else None
+        # pool_connections is the number of hosts kept warm, pool_maxsize the connections per host
+        self.adapter = PooledHTTPAdapter(self.stats, self.dns_cache, pool_connections=pool_connections,
+                                         pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+    
+    def get(self) -> requests.Session:
+        """Return the calling thread's session, creating it on first use"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(self.headers)
+            session.mount('http://', self.adapter)
+            session.mount('https://', self.adapter)
+            self._local.session = session
+        return session
+    
+    def get_stats(self) -> Dict:
+        stats = self.stats.snapshot()
+        dns_stats = self.dns_cache.get_stats() if self.dns_cache else {'hits': 0, 'misses': 0}
+        stats['dns_cache_hits'] = dns_stats['hits']
+        stats['dns_cache_misses'] = dns_stats['misses']
+        return stats
+
+
+class PolitenessScheduler:
+    """Per-host token bucket rate limiting with a per-host concurrency cap.
+
+    Buckets are keyed on the URL's netloc, so requests to different hosts never
+    wait on each other. Limits are looked up by domain suffix, e.g. a limit set
+    for 'amazon.com' also applies to 'www.amazon.com'.
+    """
+    
+    def __init__(self, default_rate: float = 2.0, default_burst: int = 4, default_concurrency: int = 4,
+                 domain_limits: Optional[Dict[str, Dict]] = None):
+        self.default_limits = {'rate': default_rate, 'burst': default_burst, 'concurrency': default_concurrency}
+        self.domain_limits = {}
+        self.poll_interval = 0.05
+        self.idle_sweep_interval = 60.0  # Seconds between sweeps that forget idle hosts
+        self._hosts = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        
+        for domain, limits in (domain_limits or {}).items():
+            self.set_domain_limit(domain, **limits)
+    
+    def set_domain_limit(self, domain: str, rate: float = None, burst: int = None, concurrency: int = None):
+        """Configure the request rate (per second), burst size and concurrency cap for a domain"""
+        limits = dict(self.default_limits)
+        if rate is not None:
+            limits['rate'] = rate
+        if burst is not None:
+            limits['burst'] = burst
+        if concurrency is not None:
+            limits['concurrency'] = concurrency
+        
+        with self._lock:
+            self.domain_limits[domain.lower().lstrip('.')] = limits
+            # Update known hosts in place: their in-flight counts belong to requests still running
+            for host, state in self._hosts.items():
+                state['limits'] = self.limits_for(host)
+                state['tokens'] = min(state['tokens'], float(state['limits']['burst']))
+    
+    def limits_for(self, host: str) -> Dict:
+        """Find the most specific configured limits for a host"""
+        labels = host.lower().split(':')[0].split('.')
+        for i in range(len(labels)):
+            limits = self.domain_limits.get('.'.join(labels[i:]))
+            if limits:
+                return limits
+        return self.default_limits
+    
+    def _try_acquire(self, host: str) -> float:
+        """Take a token and a concurrency slot for host. Returns 0 on success, else seconds to wait"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_sweep > self.idle_sweep_interval:
+                self._forget_idle_hosts(now)
+            state = self._hosts.get(host)
+            if state is None:
+                limits = self.limits_for(host)
+                state = {'limits': limits, 'tokens': float(limits['burst']), 'updated': now, 'in_flight': 0}
+                self._hosts[host] = state
+            
+            limits = state['limits']
+            state['tokens'] = min(float(limits['burst']), state['tokens'] + (now - state['updated']) * limits['rate'])
+            state['updated'] = now
+            
+            if state['in_flight'] >= limits['concurrency']:
+                return self.poll_interval
+            if state['tokens'] >= 1:
+                state['tokens'] -= 1
+                state['in_flight'] += 1
+                return 0.0
+            return max((1 - state['tokens']) / limits['rate'], 0.001)
+    
+    def _forget_idle_hosts(self, now: float):
+        """Drop hosts with nothing in flight and a full bucket, which a fresh state would match exactly"""
+        # Caller holds the lock
+        self._last_sweep = now
+        for host in [host for host, state in self._hosts.items()
+                     if not state['in_flight']
+                     and state['tokens'] + (now - state['updated']) * state['limits']['rate'] >= state['limits']['burst']]:
+            del self._hosts[host]
+    
+    def acquire(self, url: str) -> str:
+        """Block until a request to url's host is allowed. Returns the host key to release"""
+        host = urlparse(url).netloc.lower()
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return host
+            time.sleep(wait)
+    
+    async def acquire_async(self, url: str) -> str:
+        """Asyncio counterpart of acquire"""
+        host = urlparse(url).netloc.lower()
+        while True:
+            wait = self._try_acquire(host)
+            if not wait:
+                return host
+            await asyncio.sleep(wait)
+    
+    def release(self, host: str):
+        """Give back the concurrency slot taken by acquire"""
+        with self._lock:
+            state = self._hosts.get(host)
+            if state and state['in_flight'] > 0:
+                state['in_flight'] -= 1
+    
+    @contextmanager
+    def slot(self, url: str):
+        host = self.acquire(url)
+        try:
+            yield
+        finally:
+            self.release(host)
+    
+    @asynccontextmanager
+    async def slot_async(self, url: str):
+        host = await self.acquire_async(url)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+
+def extractor_fingerprint(source: str) -> str:
+    """Fingerprint of the scraper source and the parser libraries.
+
+    The whole module is hashed rather than a list of extraction functions, since
+    helpers, tables and parser wrappers all shape the extracted fields and a list
+    goes stale as soon as a new one is added.
+    """
+    digest = hashlib.sha256(str(EXTRACTOR_VERSION).encode())
+    digest.update(source.encode())
+    digest.update(f"bs4 {bs4.__version__} lxml {etree.__version__ if LXML_AVAILABLE else None}".encode())
+    return digest.hexdigest()[:16]
+
+
+def detect_encoding(content: bytes) -> str:
+    """Guess the encoding of a body whose headers name none, as requests' apparent_encoding does"""
+    return (chardet.detect(content)['encoding'] if chardet is not None else None) or 'utf-8'
+
+
+class CachedResponse:
+    """Response body served from the network or from the on-disk ResponseCache"""
+    
+    def __init__(self, url: str, content: bytes, encoding: Optional[str] = None, etag: Optional[str] = None,
+                 last_modified: Optional[str] = None, expires_at: float = 0.0, from_cache: bool = False,
+                 truncated: bool = False, sniffed_fields: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.content = content
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.expires_at = expires_at
+        self.from_cache = from_cache
+        self.truncated = truncated  # Download stopped early; only part of the page
+        self.sniffed_fields = sniffed_fields or {}  # Product fields seen while the page streamed in
+    
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+    
+    def is_fresh(self) -> bool:
+        return self.expires_at > time.time()
+    
+    def conditional_headers(self) -> Dict[str, str]:
+        """Validators for a conditional GET against the origin"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Persistent SQLite HTTP cache honoring Cache-Control, Expires, ETag and Last-Modified.
+
+    Entries older than max_age are dropped regardless of their headers, and the
+    least recently used entries are evicted once the cache exceeds max_bytes.
+    Safe to share between threads and between processes using the same file.
+    """
+    
+    def __init__(self, path: str, default_ttl: float = 6 * 3600, max_age: float = 24 * 3600,
+                 max_bytes: int = 512 * 1024 * 1024):
+        self.path = path
+        self.default_ttl = default_ttl
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.evict_interval = 50
+        self.stats = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0}
+        self._writes_since_evict = 0
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    url TEXT PRIMARY KEY,
+                    content BLOB NOT NULL,
+                    encoding TEXT,
+                    etag TEXT,
+                    last_modified TEXT,
+                    expires_at REAL NOT NULL,
+                    stored_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+            """)
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)')
+    
+    def get(self, url: str) -> Optional[CachedResponse]:
+        """Look up a cached response, fresh or stale. Returns None on a miss"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT content, encoding, etag, last_modified, expires_at, stored_at FROM responses WHERE url = ?',
+                (url,)
+            ).fetchone()
+            if row is None or row[5] + self.max_age < now:
+                self.stats['misses'] += 1
+                return None
+            with self._conn:
+                self._conn.execute('UPDATE responses SET last_access = ? WHERE url = ?', (now, url))
+        
+        content, encoding, etag, last_modified, expires_at, _ = row
+        return CachedResponse(url, content, encoding, etag, last_modified, expires_at, from_cache=True)
+    
+    def record_hit(self, revalidated: bool = False):
+        with self._lock:
+            self.stats['revalidated' if revalidated else 'hits'] += 1
+    
+    def store(self, url: str, headers, content: bytes, encoding: Optional[str] = None) -> CachedResponse:
+        """Cache a 200 response if its headers allow it and return it as a CachedResponse"""
+        lifetime = self._freshness_lifetime(headers)
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        now = time.time()
+        cached = CachedResponse(url, content, encoding, etag, last_modified, now + (lifetime or 0))
+        
+        # Nothing to gain from an entry that is neither fresh nor revalidatable
+        if lifetime is None or (lifetime <= 0 and not (etag or last_modified)):
+            return cached
+        
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (url, content, encoding, etag, last_modified, cached.expires_at, now, now, len(content))
+                )
+            self.stats['stores'] += 1
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.evict_interval:
+                self._writes_since_evict = 0
+                self._evict()
+        return cached
+    
+    def revalidate(self, cached: CachedResponse, headers) -> CachedResponse:
+        """Refresh a stale entry after the origin answered 304 Not Modified"""
+        lifetime = self._freshness_lifetime(headers) or 0
+        now = time.time()
+        cached.expires_at = now + lifetime
+        cached.etag = headers.get('ETag', cached.etag)
+        cached.last_modified = headers.get('Last-Modified', cached.last_modified)
+        
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'UPDATE responses SET expires_at = ?, etag = ?, last_modified = ?, stored_at = ?, last_access = ? WHERE url = ?',
+                    (cached.expires_at, cached.etag, cached.last_modified, now, now, cached.url)
+                )
+            self.stats['revalidated'] += 1
+        return cached
+    
+    def _freshness_lifetime(self, headers) -> Optional[float]:
+        """Seconds a response stays fresh, 0 to always revalidate, None if it must not be stored"""
+        directives = {}
+        for part in headers.get('Cache-Control', '').lower().split(','):
+            key, _, value = part.strip().partition('=')
+            if key:
+                directives[key] = value.strip('"')
+        
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+        for key in ('s-maxage', 'max-age'):
+            if key in directives:
+                try:
+                    return max(float(directives[key]), 0)
+                except ValueError:
+                    break
+        
+        expires = headers.get('Expires')
+        if expires:
+            try:
+                return max(parsedate_to_datetime(expires).timestamp() - time.time(), 0)
+            except (TypeError, ValueError):
+                return 0
+        
+        # Heuristic freshness: 10% of the time since last modification
+        last_modified = headers.get('Last-Modified')
+        if last_modified:
+            try:
+                age = time.time() - parsedate_to_datetime(last_modified).timestamp()
+                return min(max(age * 0.1, 0), self.default_ttl)
+            except (TypeError, ValueError):
+                pass
+        
+        return self.default_ttl
+    
+    def _evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes. Caller holds the lock"""
+        with self._conn:
+            self._conn.execute('DELETE FROM responses WHERE stored_at < ?', (time.time() - self.max_age,))
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            
+            to_delete = []
+            for url, size in self._conn.execute('SELECT url, size FROM responses ORDER BY last_access'):
+                if total <= self.max_bytes:
+                    break
+                to_delete.append((url,))
+                total -= size
+            self._conn.executemany('DELETE FROM responses WHERE url = ?', to_delete)
+        logger.info(f"Response cache evicted {len(to_delete)} entries")
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+class ImageStore:
+    """Content-addressed on-disk store for processed product thumbnails.
+
+    Files are named by the SHA-256 of their bytes, so an image shared by several
+    retailers is stored once. The least recently stored files are pruned once the
+    store grows past max_bytes.
+    """
+    
+    KEY_RE = re.compile(r'[0-9a-f]{64}')
+    
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.prune_interval = 200
+        self.stats = {'stores': 0, 'duplicates': 0}
+        self._writes_since_prune = 0
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+    
+    def put(self, data: bytes) -> str:
+        """Store image bytes and return their key"""
+        key = hashlib.sha256(data).hexdigest()
+        path = self.path_for(key)
+        if os.path.exists(path):
+            os.utime(path)  # Keep shared images from being pruned first
+            with self._lock:
+                self.stats['duplicates'] += 1
+            return key
+        
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self.stats['stores'] += 1
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= self.prune_interval:
+                self._writes_since_prune = 0
+                self._prune()
+        return key
+    
+    def path_for(self, key: str) -> str:
+        """File path of an image key; raises ValueError for anything that is not a key"""
+        if not self.KEY_RE.fullmatch(key or ''):
+            raise ValueError(f"Invalid image key: {key!r}")
+        return os.path.join(self.path, key[:2], f"{key}.jpg")
+    
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self.path_for(key), 'rb') as f:
+                return f.read()
+        except (OSError, ValueError):
+            return None
+    
+    def __contains__(self, key: str) -> bool:
+        try:
+            return os.path.exists(self.path_for(key))
+        except ValueError:
+            return False
+    
+    def _prune(self):
+        """Delete the oldest files until under max_bytes. Caller holds the lock"""
+        files = []
+        total = 0
+        for root, _, names in os.walk(self.path):
+            for name in names:
+                if name.endswith('.jpg'):
+                    try:
+                        stat = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue
+                    files.append((stat.st_mtime, stat.st_size, os.path.join(root, name)))
+                    total += stat.st_size
+        if total <= self.max_bytes:
+            return
+        
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        logger.info(f"Image store pruned {removed} files")
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = frozenset({
+    'gclid', 'gclsrc', 'dclid', 'fbclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl'
+})
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so trivially different spellings of the same page compare equal.
+
+    Lowercases the scheme and host, drops default ports, fragments and tracking
+    parameters (utm_* and TRACKING_PARAMS) and sorts the remaining query. The
+    result stays fetchable: userinfo and IPv6 brackets are kept.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    userinfo, at, hostport = parts.netloc.rpartition('@')
+    hostport = hostport.lower()
+    try:
+        port = parts.port
+        if port is None or (scheme, port) in (('http', 80), ('https', 443)):
+            hostport = re.sub(r':\d*$', '', hostport)
+    except ValueError:
+        pass  # Malformed port - keep the netloc as given
+    netloc = userinfo + at + hostport
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, netloc, parts.path or '/', urlencode(query), ''))
+
+
+class Product:
+    """Scraped product record.
+
+    Slotted to keep per-record memory down on large result sets, with price_amount
+    and rating_value as numbers. Item access and get() mirror the product dicts this
+    replaces, so existing consumers keep working; get() treats unset (None) fields as
+    missing. to_dict() gives a plain dict for JSON, caches and DataFrames.
+    """
+    __slots__ = ('name', 'price', 'price_amount', 'price_currency', 'location', 'product_url', 'image_url',
+                 'image_key', 'availability', 'rating', 'rating_value', 'description', 'domain', 'region',
+                 'search_title', 'search_snippet', 'search_region', 'search_source')
+    
+    def __init__(self, **fields):
+        for field in self.__slots__:
+            setattr(self, field, fields.pop(field, None))
+        if fields:
+            raise TypeError(f"Unknown product fields: {', '.join(fields)}")
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Product':
+        """Build a product from a dict, ignoring keys that are not product fields"""
+        return cls(**{key: value for key, value in data.items() if key in cls.__slots__})
+    
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+    
+    def copy(self) -> 'Product':
+        return Product(**self.to_dict())
+    
+    def keys(self):
+        return self.__slots__
+    
+    def items(self):
+        return self.to_dict().items()
+    
+    def get(self, field: str, default=None):
+        value = getattr(self, field, None) if field in self.__slots__ else None
+        return default if value is None else value
+    
+    def __getitem__(self, field: str):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        return getattr(self, field)
+    
+    def __setitem__(self, field: str, value):
+        if field not in self.__slots__:
+            raise KeyError(field)
+        setattr(self, field, value)
+    
+    def __contains__(self, field: str) -> bool:
+        return field in self.__slots__ and getattr(self, field) is not None
+    
+    def __eq__(self, other):
+        if not isinstance(other, Product):
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self.__slots__)
+    
+    __hash__ = None  # Mutable, like the dicts it replaces
+    
+    def __getstate__(self):
+        return self.to_dict()
+    
+    def __setstate__(self, state: Dict):
+        for field in self.__slots__:
+            setattr(self, field, state.get(field))
+    
+    def __repr__(self):
+        return f"Product(name={self.name!r}, price={self.price!r}, product_url={self.product_url!r})"
+
+
+class URLCache:
+    """Thread-safe LRU cache of scraped products keyed on canonicalized URLs.
+
+    Entries expire after ttl seconds and the least recently used ones are
+    evicted beyond max_entries, so memory stays flat on a long-lived server.
+    """
+    
+    def __init__(self, max_entries: int = 1000, ttl: float = 3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # canonical url -> (expires_at, product)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    
+    def get(self, url: str) -> Optional[Product]:
+        """Copy of the cached product for url, or None"""
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1].copy()
+    
+    def put(self, url: str, product: Product):
+        key = canonicalize_url(url)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, product.copy())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def __contains__(self, url: str) -> bool:
+        key = canonicalize_url(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] >= time.monotonic()
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats, entries=len(self._entries))
+
+
+class ParseCache:
+    """Persistent cache of extracted products keyed on (URL, body hash, extractor version).
+
+    Entries written by a different extractor version are purged on open, so a
+    change to the extraction code invalidates everything parsed with the old code.
+    """
+    
+    def __init__(self, path: str, extractor_version: str, max_age: float = 7 * 24 * 3600):
+        self.path = path
+        self.extractor_version = extractor_version
+        self.max_age = max_age
+        self.stats = {'hits': 0, 'misses': 0}
+        self._lock = threading.Lock()
+        
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS parsed (
+                    url TEXT NOT NULL,
+                    body_hash TEXT NOT NULL,
+                    extractor_version TEXT NOT NULL,
+                    product TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    PRIMARY KEY (url, body_hash, extractor_version)
+                )
+            """)
+            self._conn.execute(
+                'DELETE FROM parsed WHERE extractor_version != ? OR stored_at < ?',
+                (extractor_version, time.time() - max_age)
+            )
+    
+    def get(self, url: str, body_hash: str) -> Optional[Product]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT product FROM parsed WHERE url = ? AND body_hash = ? AND extractor_version = ?',
+                (url, body_hash, self.extractor_version)
+            ).fetchone()
+            self.stats['hits' if row else 'misses'] += 1
+        return Product.from_dict(json.loads(row[0])) if row else None
+    
+    def store(self, url: str, body_hash: str, product: Product):
+        # Only what the page itself determines: images are fetched separately, and region and
+        # location come from the domain catalog, which can change while the page does not
+        record = dict(product.to_dict(), image_key=None, region=None, location=None)
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)',
+                    (url, body_hash, self.extractor_version, json.dumps(record), time.time())
+                )
+    
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return dict(self.stats)
+
+
+class LxmlTag:
+    """Minimal BeautifulSoup Tag look-alike over an lxml element"""
+    __slots__ = ('element',)
+    
+    def __init__(self, element):
+        self.element = element
+    
+    def get_text(self) -> str:
+        return _lxml_text(self.element)
+    
+    def get(self, name: str, default=None):
+        return self.element.get(name, default)
+
+
+class LxmlSoup:
+    """BeautifulSoup-compatible facade over an lxml tree with precompiled CSS selectors.
+
+    Implements only what the _extract_* methods use (select, select_one,
+    get_text, get) so they run unchanged on either backend.
+    """
+    
+    def __init__(self, html: str):
+        self.root = lxml.html.document_fromstring(html.encode('utf-8'), parser=_lxml_state().parser)
+    
+    def select(self, selector: str) -> List[LxmlTag]:
+        return [LxmlTag(element) for element in _compiled_selector(selector)(self.root)]
+    
+    def select_one(self, selector: str) -> Optional[LxmlTag]:
+        matches = _compiled_selector(selector)(self.root)
+        return LxmlTag(matches[0]) if matches else None
+    
+    def get_text(self) -> str:
+        return _lxml_text(self.root)
+
+
+# lxml parsers and compiled XPath objects are not shared between threads
+_lxml_local = threading.local()
+
+def _lxml_state():
+    """Per-thread lxml parser, text XPath and compiled selector cache"""
+    state = _lxml_local
+    if not hasattr(state, 'parser'):
+        state.parser = lxml.html.HTMLParser(encoding='utf-8')
+        # BeautifulSoup's get_text() skips script, style and template contents
+        state.text_xpath = etree.XPath(
+            'descendant-or-self::text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::template)]'
+        )
+        state.selectors = {}
+    return state
+
+def _compiled_selector(selector: str):
+    """Compile a CSS selector to XPath once per thread"""
+    selectors = _lxml_state().selectors
+    compiled = selectors.get(selector)
+    if compiled is None:
+        compiled = selectors[selector] = CSSSelector(selector, translator='html')
+    return compiled
+
+def _lxml_text(element) -> str:
+    if element.tag in ('script', 'style', 'template'):
+        return element.text_content()
+    return ''.join(_lxml_state().text_xpath(element))
+
+
+# CSS selectors per product field, in priority order
+FIELD_SELECTORS = {
+    'name': (
+        'h1[id*="title"]', 'h1[class*="title"]', 'h1[class*="name"]',
+        '.product-title h1', '.product-name h1', '.item-title h1',
+        'h1', '.title', '.product-title', '.product-name',
+        '[data-testid="product-title"]', '[itemprop="name"]'
+    ),
+    'price': (
+        '.a-price-whole', '.a-price', '.price-current', '.price-now',
+        '.product-price', '.current-price', '.sale-price', '.price',
+        '[data-testid="price"]', '.notranslate', '[class*="price"]',
+        '[itemprop="price"]', '.price-box', '.pricing'
+    ),
+    'image_url': (
+        '#landingImage', '#imgBlkFront', '.product-image img',
+        '.main-image img', 'meta[property="og:image"]',
+        'img[itemprop="image"]', '.gallery-image img'
+    ),
+    'availability': (
+        '#availability', '.availability', '.stock', '[id*="stock"]'
+    ),
+    'rating': (
+        '.a-icon-alt', '.rating', '.stars', '[itemprop="ratingValue"]'
+    ),
+    'description': (
+        '#productDescription', '.product-description', '.description',
+        '[itemprop="description"]', '.product-details'
+    )
+}
+
+# og:image is checked before every other image selector
+OG_IMAGE_SELECTOR = 'meta[property="og:image"]'
+
+# schema.org availability values mapped to the labels used across the app
+SCHEMA_AVAILABILITY = {
+    'instock': "In Stock", 'instoreonly': "In Stock", 'onlineonly': "In Stock",
+    'preorder': "Pre-order", 'presale': "Pre-order", 'backorder': "Backorder",
+    'limitedavailability': "Limited Stock",
+    'outofstock': "Out of Stock", 'soldout': "Out of Stock", 'discontinued': "Out of Stock"
+}
+
+CURRENCY_SYMBOLS = {'USD': '$', 'EUR': '€', 'GBP': '£', 'INR': '₹', 'JPY': '¥'}
+
+# Price patterns in priority order, with the ISO currency each one implies
+PRICE_PATTERNS = (
+    (r'\$\s*[\d,]+(?:\.\d{1,2})?', 'USD'),
+    (r'€\s*[\d,]+(?:\.\d{1,2})?', 'EUR'),
+    (r'£\s*[\d,]+(?:\.\d{1,2})?', 'GBP'),
+    (r'₹\s*[\d,]+(?:\.\d{1,2})?', 'INR'),
+    (r'PKR\s*[\d,]+(?:\.\d{1,2})?', 'PKR'),
+    (r'¥\s*[\d,]+', 'JPY'),
+    (r'AED\s*[\d,]+(?:\.\d{1,2})?', 'AED'),
+    (r'SAR\s*[\d,]+(?:\.\d{1,2})?', 'SAR'),
+    (r'[\d,]+(?:\.\d{1,2})?\s*(?:USD|EUR|GBP|INR|PKR|JPY|AED|SAR)', None),  # Currency read from the code
+    (r'Rs\.?\s*[\d,]+(?:\.\d{1,2})?', None),  # Rupee sign is shared by INR, PKR, LKR, NPR
+)
+
+# One scanner for every pattern: the lookahead reports a match at each position,
+# and the alternation order means it is always the highest-priority one there.
+# The leading character class (first characters of PRICE_PATTERNS) skips dead positions cheaply.
+PRICE_SCANNER = re.compile(
+    '(?=[$€£₹¥pasr\\d,])(?=' + '|'.join(f'(?P<p{i}>{pattern})' for i, (pattern, _) in enumerate(PRICE_PATTERNS)) + ')',
+    re.IGNORECASE
+)
+_PRICE_NUMBER_RE = re.compile(r'[\d,]+(?:\.\d+)?')
+_STRUCTURED_PRICE_RE = re.compile(r'([A-Z]{3}) ([\d,]+(?:\.\d+)?)')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def _parse_decimal(amount: str) -> Optional[Decimal]:
+    """Read a number written with either decimal mark, e.g. "1,299.50", "1.299,50" or "12,50".
+
+    The last separator is the decimal one, unless it is a comma grouping thousands
+    ("1,299"). Repeated separators only group thousands ("1.299.000").
+    """
+    amount = re.sub(r'\s', '', amount)
+    if ',' in amount and '.' in amount:
+        decimal_mark = ',' if amount.rfind(',') > amount.rfind('.') else '.'
+    elif amount.count(',') == 1 and not re.search(r',\d{3}$', amount):
+        decimal_mark = ','
+    elif amount.count('.') == 1:
+        decimal_mark = '.'
+    else:
+        decimal_mark = None
+    if decimal_mark:
+        whole, _, fraction = amount.rpartition(decimal_mark)
+    else:
+        whole, fraction = amount, ''
+    try:
+        return Decimal(re.sub(r'[,.]', '', whole) + ('.' + fraction if fraction else ''))
+    except InvalidOperation:
+        return None
+
+
+FIELD_DEFAULTS = {
+    'name': "Product name not found",
+    'image_url': "",
+    'availability': "Unknown",
+    'rating': "No rating",
+    'description': "No description available"
+}
+
+_SELECTOR_TOKEN_RE = re.compile(
+    r'(?P<tag>[a-zA-Z][\w-]*)|#(?P<id>[\w-]+)|\.(?P<cls>[\w-]+)'
+    r'|\[(?P<attr>[\w-]+)(?:(?P<op>[*^$]?=)"(?P<value>[^"]*)")?\]'
+)
+
+
+class SimpleSelector:
+    """CSS selector made of compound selectors joined by descendant combinators.
+
+    Unlike soup.select, it tests one element at a time (given its ancestors),
+    which lets a single document walk evaluate every field selector at once.
+    """
+    
+    def __init__(self, selector: str):
+        self.selector = selector
+        self.compounds = [self._parse_compound(part) for part in selector.split()]
+        self.key = self._dispatch_key(self.compounds[-1])
+    
+    @staticmethod
+    def _parse_compound(text: str) -> Dict:
+        compound = {'tag': None, 'ids': [], 'classes': [], 'attrs': []}
+        pos = 0
+        while pos < len(text):
+            match = _SELECTOR_TOKEN_RE.match(text, pos)
+            if not match or (match.group('tag') and pos):
+                raise ValueError(f"Unsupported selector: '{text}'")
+            if match.group('tag'):
+                compound['tag'] = match.group('tag').lower()
+            elif match.group('id'):
+                compound['ids'].append(match.group('id'))
+            elif match.group('cls'):
+                compound['classes'].append(match.group('cls'))
+            else:
+                compound['attrs'].append((match.group('attr').lower(), match.group('op'), match.group('value')))
+            pos = match.end()
+        return compound
+    
+    @staticmethod
+    def _dispatch_key(compound: Dict) -> Tuple:
+        """Cheapest element property that must be present for the selector to match"""
+        if compound['ids']:
+            return ('id', compound['ids'][0])
+        if compound['classes']:
+            return ('class', compound['classes'][0])
+        if compound['tag']:
+            return ('tag', compound['tag'])
+        if compound['attrs']:
+            return ('attr', compound['attrs'][0][0])
+        return ('*',)
+    
+    @staticmethod
+    def _matches_compound(compound: Dict, tag: str, attrs) -> bool:
+        if compound['tag'] and compound['tag'] != tag:
+            return False
+        for element_id in compound['ids']:
+            if _attr_value(attrs, 'id') != element_id:
+                return False
+        if compound['classes']:
+            classes = (_attr_value(attrs, 'class') or '').split()
+            if any(cls not in classes for cls in compound['classes']):
+                return False
+        for name, op, value in compound['attrs']:
+            actual = _attr_value(attrs, name)
+            if actual is None:
+                return False
+            if op == '=' and actual != value:
+                return False
+            if op == '*=' and (not value or value not in actual):
+                return False
+            if op == '^=' and (not value or not actual.startswith(value)):
+                return False
+            if op == '$=' and (not value or not actual.endswith(value)):
+                return False
+        return True
+    
+    def matches(self, tag: str, attrs, ancestors: List[Tuple]) -> bool:
+        """Test an element given its (tag, attrs) ancestors, outermost first"""
+        if not self._matches_compound(self.compounds[-1], tag, attrs):
+            return False
+        
+        remaining = len(self.compounds) - 2
+        for ancestor_tag, ancestor_attrs in reversed(ancestors):
+            if remaining < 0:
+                break
+            if self._matches_compound(self.compounds[remaining], ancestor_tag, ancestor_attrs):
+                remaining -= 1
+        return remaining < 0
+
+
+def _attr_value(attrs, name: str) -> Optional[str]:
+    value = attrs.get(name)
+    # BeautifulSoup splits multi-valued attributes such as class into lists
+    if value is not None and not isinstance(value, str):
+        value = ' '.join(value)
+    return value
+
+
+def _build_selector_index() -> Dict[Tuple, List[Tuple]]:
+    """Map dispatch keys to (field, priority, selector) for every field selector"""
+    index = {}
+    entries = [('image_url', -1, OG_IMAGE_SELECTOR)]
+    for field, selectors in FIELD_SELECTORS.items():
+        entries.extend((field, priority, selector) for priority, selector in enumerate(selectors))
+    
+    for field, priority, selector in entries:
+        compiled = SimpleSelector(selector)
+        index.setdefault(compiled.key, []).append((field, priority, compiled))
+    return index
+
+FIELD_SELECTOR_INDEX = _build_selector_index()
+
+
+def _iter_elements(soup):
+    """Walk a parsed document in document order, yielding (element, tag, attrs, ancestors)"""
+    if isinstance(soup, LxmlSoup):
+        roots = [soup.root]
+        children = iter
+        describe = lambda node: (node.tag, node.attrib) if isinstance(node.tag, str) else (None, None)
+        wrap = LxmlTag
+    else:
+        roots = soup.children
+        children = lambda node: iter(node.children)
+        describe = lambda node: (node.name, node.attrs) if isinstance(node, Tag) else (None, None)
+        wrap = lambda node: node
+    
+    ancestors = []
+    stack = [iter(roots)]
+    while stack:
+        for node in stack[-1]:
+            tag, attrs = describe(node)
+            if tag is None:
+                continue
+            yield wrap(node), tag, attrs, ancestors
+            ancestors.append((tag, attrs))
+            stack.append(children(node))
+            break
+        else:
+            stack.pop()
+            if ancestors:
+                ancestors.pop()
+
+
+class EarlyFieldSniffer(HTMLParser):
+    """Incremental HTML parser that notices structured product data as a page streams in.
+
+    Watches OpenGraph/product meta tags and JSON-LD Product blocks, which is
+    where the name, price and image usually live near the top of a page.
+    """
+    
+    def __init__(self, scraper: 'ProductScraper', base_url: str):
+        super().__init__(convert_charrefs=True)
+        self.scraper = scraper
+        self.base_url = base_url
+        self.fields = {}
+        self._json_ld = None
+    
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            prop = (attrs.get('property') or '').strip().lower()
+            content = (attrs.get('content') or '').strip()
+            if not content:
+                return
+            if prop == 'og:title':
+                self.fields.setdefault('name', content)
+            elif prop == 'og:image':
+                self.fields.setdefault('image_url', urljoin(self.base_url, content))
+            elif prop in ('product:price:amount', 'og:price:amount'):
+                self.fields.setdefault('price_amount', content)
+            elif prop in ('product:price:currency', 'og:price:currency'):
+                self.fields.setdefault('price_currency', content)
+            
+            if 'price' not in self.fields and 'price_amount' in self.fields:
+                price = self.scraper._format_structured_price(self.fields['price_amount'], self.fields.get('price_currency'))
+                if price:
+                    self.fields['price'] = price
+        elif tag == 'script' and (attrs.get('type') or '').strip().lower() == 'application/ld+json':
+            self._json_ld = []
+    
+    def handle_data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+    
+    def handle_endtag(self, tag):
+        if tag != 'script' or self._json_ld is None:
+            return
+        text, self._json_ld = ''.join(self._json_ld), None
+        try:
+            product = self.scraper._find_json_ld_product(json.loads(text))
+        except ValueError:
+            return
+        if product:
+            found = {}
+            self.scraper._read_json_ld_product(product, self.base_url, found)
+            for field, value in found.items():
+                self.fields.setdefault(field, value)
+    
+    def has_fields(self, required: Iterable[str]) -> bool:
+        return all(field in self.fields for field in required)
+
+
+class StreamingBodyReader:
+    """Accumulates a streamed HTML body and decides when enough of it has been read"""
+    
+    def __init__(self, scraper: 'ProductScraper', url: str, encoding: Optional[str]):
+        self.byte_budget = scraper.stream_byte_budget
+        self.required_fields = scraper.stream_required_fields
+        self.chunks = []
+        self.size = 0
+        self.truncated = False
+        self.sniffer = EarlyFieldSniffer(scraper, url)
+        try:
+            self.decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+        except LookupError:
+            self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    
+    def feed(self, chunk: bytes) -> bool:
+        """Add a chunk. Returns True once the download can stop; then call stop()"""
+        self.chunks.append(chunk)
+        self.size += len(chunk)
+        
+        if self.sniffer is not None:
+            try:
+                self.sniffer.feed(self.decoder.decode(chunk))
+            except Exception:
+                self.sniffer = None  # Keep reading up to the byte budget
+        
+        return self.size >= self.byte_budget or (self.sniffer is not None and self.sniffer.has_fields(self.required_fields))
+    
+    def stop(self, next_chunk: bytes):
+        """End the download with the next chunk of the stream, empty if the body was already complete"""
+        if next_chunk:
+            self.chunks.append(next_chunk)
+            self.size += len(next_chunk)
+            self.truncated = True
+    
+    @property
+    def content(self) -> bytes:
+        return b''.join(self.chunks)
+    
+    @property
+    def fields(self) -> Dict[str, str]:
+        """Product fields the sniffer has found"""
+        if self.sniffer is None:
+            return {}
+        return {field: value for field, value in self.sniffer.fields.items() if field in FIELD_SELECTORS}
+
+
+class PriceInfo:
+    """Price parsed from text: numeric amount, ISO currency code (when known) and the matched text"""
+    
+    def __init__(self, amount: Optional[Decimal], currency: Optional[str], raw: str):
+        self.amount = amount
+        self.currency = currency
+        self.raw = raw
+    
+    def __repr__(self):
+        return f"PriceInfo({self.amount!r}, {self.currency!r}, {self.raw!r})"
+
+
+# Region and location fallbacks by top-level domain; the most specific suffix wins,
+# so site entries always take precedence over these
+REGION_TLDS = {
+    'uk': 'uk-en', 'de': 'de-de', 'fr': 'fr-fr', 'it': 'it-it', 'es': 'es-es',
+    'jp': 'jp-jp', 'in': 'in-en', 'au': 'au-en', 'ca': 'ca-en', 'br': 'br-pt',
+    'mx': 'mx-es', 'ae': 'ae-en', 'sa': 'sa-ar', 'pk': 'pk-en', 'kr': 'kr-kr',
+    'cn': 'cn-zh', 'sg': 'sg-en',
+    'com': 'us-en'
+}
+
+LOCATION_DOMAINS = {
+    'amazon.com': 'United States', 'amazon.co.uk': 'United Kingdom',
+    'amazon.de': 'Germany', 'amazon.fr': 'France', 'amazon.in': 'India',
+    'flipkart.com': 'India', 'pakwheels.com': 'Pakistan', 'daraz.pk': 'Pakistan',
+    'noon.com': 'United Arab Emirates', 'walmart.com': 'United States',
+    'ebay.com': 'United States', 'ebay.co.uk': 'United Kingdom'
+}
+
+LOCATION_TLDS = {
+    'uk': 'United Kingdom', 'de': 'Germany', 'fr': 'France',
+    'in': 'India', 'pk': 'Pakistan', 'ae': 'United Arab Emirates',
+    'jp': 'Japan', 'au': 'Australia', 'ca': 'Canada'
+}
+
+
+def normalize_host(value: str) -> str:
+    """Reduce a URL, netloc or domain to a bare lowercase host name"""
+    value = (value or '').strip().lower()
+    if '://' in value:
+        value = urlparse(value).netloc
+    value = value.rsplit('@', 1)[-1]
+    if value.startswith('['):
+        value = value.split(']', 1)[0] + ']'  # IPv6 literal, its colons are not a port
+    else:
+        value = value.split(':', 1)[0]
+    return value.strip('.')
+
+
+class DomainSuffixIndex:
+    """Maps domain suffixes to values, matched on whole labels.
+
+    An entry for 'amazon.com' covers amazon.com and www.amazon.com but not
+    notamazon.com or amazon.com.evil.net. Lookups probe one hash entry per label
+    of the host and return the most specific match.
+    """
+    
+    def __init__(self, entries=None):
+        self._suffixes = {}
+        if entries:
+            self.update(entries)
+    
+    def add(self, suffix: str, value=True):
+        key = normalize_host(suffix)
+        if key:
+            self._suffixes[key] = value
+    
+    def update(self, entries):
+        """Add a mapping of suffix -> value, or an iterable of suffixes"""
+        items = entries.items() if isinstance(entries, dict) else ((suffix, True) for suffix in entries)
+        for suffix, value in items:
+            self.add(suffix, value)
+    
+    def match(self, host: str) -> Optional[str]:
+        """Most specific indexed suffix of host, if any"""
+        host = normalize_host(host)
+        start = 0
+        while host:
+            if host[start:] in self._suffixes:
+                return host[start:]
+            start = host.find('.', start) + 1
+            if not start:
+                return None
+        return None
+    
+    def lookup(self, host: str, default=None):
+        suffix = self.match(host)
+        return self._suffixes[suffix] if suffix is not None else default
+    
+    def __contains__(self, host: str) -> bool:
+        return self.match(host) is not None
+    
+    def __len__(self):
+        return len(self._suffixes)
+
+
+class DomainCatalog:
+    """Versioned local copy of the e-commerce domain CSV.
+
+    The catalog file holds parsed (domain, region) rows as JSON, so loading it needs
+    neither the network nor CSV parsing. refresh() downloads the CSV, conditionally
+    when the saved copy has validators, and rewrites the file atomically. Without a
+    usable catalog file the seed CSV shipped with the code is loaded instead.
+    """
+    
+    FORMAT_VERSION = 1
+    _refreshing = set()  # Catalog paths with a background refresh under way
+    _refreshing_lock = threading.Lock()
+    
+    def __init__(self, path: Optional[str], source_url: str = DOMAIN_CATALOG_URL, max_age: float = 7 * 24 * 3600,
+                 seed_path: Optional[str] = DOMAIN_CATALOG_SEED):
+        self.path = path
+        self.source_url = source_url
+        self.seed_path = seed_path
+        self.max_age = max_age
+        self.rows: List[Tuple[str, Optional[str]]] = []
+        self.fetched_at = 0.0
+        self.etag = None
+        self.last_modified = None
+    
+    def load(self) -> bool:
+        """Read the catalog file, or the seed when it is missing, unreadable or from another format version.
+
+        Returns True when the catalog file was read. Seed rows count as stale, so they are
+        replaced as soon as a refresh succeeds.
+        """
+        if self._load_file():
+            return True
+        self._load_seed()
+        return False
+    
+    def _load_file(self) -> bool:
+        if not self.path:
+            return False
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != self.FORMAT_VERSION or data.get('source') != self.source_url:
+                return False
+            self.rows = [(domain, region) for domain, region in data['domains']]
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Could not read domain catalog {self.path}: {e}")
+            return False
+        
+        self.fetched_at = data.get('fetched_at', 0.0)
+        self.etag = data.get('etag')
+        self.last_modified = data.get('last_modified')
+        return True
+    
+    def _load_seed(self):
+        if not self.seed_path:
+            return
+        try:
+            with open(self.seed_path, encoding='utf-8') as f:
+                self.rows = self.parse_csv(f.read())
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read domain catalog seed {self.seed_path}: {e}")
+    
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at > self.max_age
+    
+    def refresh(self, timeout: float = 15) -> bool:
+        """Download the CSV into the catalog. Returns True when the rows changed"""
+        headers = {}
+        if self.rows:
+            if self.etag:
+                headers['If-None-Match'] = self.etag
+            if self.last_modified:
+                headers['If-Modified-Since'] = self.last_modified
+        
+        response = requests.get(self.source_url, headers=headers, timeout=timeout)
+        if response.status_code == 304:
+            self.fetched_at = time.time()
+            self._save()
+            return False
+        response.raise_for_status()
+        
+        rows = self.parse_csv(response.content.decode('utf-8'))
+        changed = rows != self.rows
+        self.rows = rows
+        self.fetched_at = time.time()
+        self.etag = response.headers.get('ETag')
+        self.last_modified = response.headers.get('Last-Modified')
+        self._save()
+        return changed
+    
+    def refresh_in_background(self, on_update) -> bool:
+        """Refresh on a daemon thread and pass the new rows to on_update if they changed.
+
+        Returns False without starting a thread when this catalog file is already being refreshed.
+        """
+        with self._refreshing_lock:
+            if self.path in self._refreshing:
+                return False
+            self._refreshing.add(self.path)
+        
+        def run():
+            try:
+                if self.refresh():
+                    on_update(self.rows)
+            except Exception as e:
+                logger.warning(f"Could not refresh domain catalog from {self.source_url}: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(self.path)
+        
+        threading.Thread(target=run, daemon=True).start()
+        return True
+    
+    @staticmethod
+    def parse_csv(text: str) -> List[Tuple[str, Optional[str]]]:
+        """(domain, search region) rows of the catalog CSV, first occurrence of each domain only"""
+        rows = []
+        seen = set()
+        for row in csv.DictReader(io.StringIO(text)):
+            domain = (row.get('Domain') or '').strip()
+            if not domain or domain in seen:
+                continue
+            seen.add(domain)
+            
+            region = (row.get('Region') or '').strip()
+            language_code = (row.get('Language Code') or '').strip()
+            search_region = CATALOG_REGION_CODES.get(region, language_code.lower()) if region and language_code else None
+            rows.append((domain, search_region))
+        return rows
+    
+    def _save(self):
+        if not self.path:
+            return
+        data = {
+            'format': self.FORMAT_VERSION,
+            'source': self.source_url,
+            'fetched_at': self.fetched_at,
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'domains': self.rows
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+
+class SearchCollector:
+    """Merges results streamed by search methods running in parallel.
+
+    URLs are deduplicated across methods under one lock. A URL found by several
+    methods is credited to the earliest one in search_methods order, so the merged
+    list matches what running the methods one after another would produce.
+
+    Results are released through take_ready() as soon as their place in that
+    order is settled: everything from finished methods at the front, plus what
+    the first unfinished method has found so far. Once max_results have been
+    released the collector is done and emit() tells the remaining methods to stop.
+    """
+    
+    def __init__(self, method_count: int, max_results: int):
+        self.max_results = max_results
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self._ready = threading.Condition(self.lock)
+        self._owners = {}  # url -> index of the method credited with it
+        self._results = [{} for _ in range(method_count)]  # per method, url -> result in arrival order
+        self._finished = [False] * method_count
+        self._released = [0] * method_count
+        self._released_total = 0
+    
+    def emit(self, index: int, result: Dict) -> bool:
+        """Offer a result from method index. Returns False once the search has enough results"""
+        if self.done.is_set():
+            return False
+        
+        url = result['url']
+        with self.lock:
+            owner = self._owners.get(url)
+            if owner is None or index < owner:
+                if owner is not None:
+                    del self._results[owner][url]
+                self._owners[url] = index
+                self._results[index][url] = result
+                self._ready.notify_all()
+        return True
+    
+    def finish(self, index: int):
+        """Mark method index as finished"""
+        with self.lock:
+            self._finished[index] = True
+            self._ready.notify_all()
+    
+    def close(self):
+        """Stop the search; methods still running stop at their next result"""
+        with self.lock:
+            self.done.set()
+            self._ready.notify_all()
+    
+    def take_ready(self, timeout: float = None) -> Optional[List[Dict]]:
+        """Wait for newly settled results and return them in order. Returns None once the search is over"""
+        with self.lock:
+            while True:
+                ready = self._collect_ready()
+                if ready:
+                    return ready
+                if self._released_total >= self.max_results or self.done.is_set() or all(self._finished):
+                    self.done.set()
+                    return None
+                if not self._ready.wait(timeout):
+                    return []
+    
+    def _collect_ready(self) -> List[Dict]:
+        ready = []
+        for index, results in enumerate(self._results):
+            room = self.max_results - self._released_total
+            if room <= 0:
+                break
+            fresh = list(islice(results.values(), self._released[index], self._released[index] + room))
+            self._released[index] += len(fresh)
+            self._released_total += len(fresh)
+            ready.extend(fresh)
+            # Results of later methods can still be displaced until this one finishes
+            if not self._finished[index]:
+                break
+        return ready
+    
+    def method_count(self, index: int) -> int:
+        with self.lock:
+            return len(self._results[index])
+    
+    def seen_urls(self) -> Set[str]:
+        with self.lock:
+            return set(self._owners)
+    
+    def __len__(self):
+        with self.lock:
+            return len(self._owners)
+
+
+class BatchScheduler:
+    """Shared scrape queue for the queries of a batch.
+
+    A URL is scraped once however many queries found it, and every query that
+    asked for it gets the product. Workers take URLs from the queries in turn, so a
+    query with many results cannot starve the others.
+
+    Results go to the deliveries queue as (query, search_result, product), followed
+    by (query, None, None) once a query has been searched and received everything
+    it asked for. Puts happen under the lock, so that marker always comes last.
+    """
+    
+    def __init__(self, queries: Iterable[str], deliveries: queue.Queue):
+        self.deliveries = deliveries
+        self.lock = threading.Lock()
+        self.scraped = 0
+        self._ready = threading.Condition(self.lock)
+        self._queues = OrderedDict()  # query -> deque of canonical URLs it is waiting for, in turn order
+        self._entries = {}  # canonical URL -> [url, [(query, search_result), ...], done, product]
+        self._outstanding = {query: 0 for query in queries}
+        self._searching = set(self._outstanding)
+        self._closed = False
+    
+    def add(self, query: str, search_result: Dict):
+        """Register a search result of query, delivering at once if its URL was already scraped"""
+        canonical_url = canonicalize_url(search_result['url'])
+        with self.lock:
+            entry = self._entries.get(canonical_url)
+            if entry is None:
+                self._entries[canonical_url] = [search_result['url'], [(query, search_result)], False, None]
+                self._queues.setdefault(query, deque()).append(canonical_url)
+                self._outstanding[query] += 1
+                self._ready.notify()
+            elif any(requester == query for requester, _ in entry[1]):
+                return  # A variant of a URL this query already has
+            else:
+                entry[1].append((query, search_result))
+                if entry[2]:
+                    self.deliveries.put((query, search_result, entry[3]))
+                else:
+                    self._outstanding[query] += 1
+    
+    def finish_search(self, query: str):
+        with self.lock:
+            self._searching.discard(query)
+            self._settle(query)
+            self._ready.notify_all()
+    
+    def take(self) -> Optional[Tuple[str, str]]:
+        """Wait for the next (canonical URL, URL) to scrape. Returns None once the batch has nothing left"""
+        with self.lock:
+            while not self._closed:
+                if self._queues:
+                    query, urls = next(iter(self._queues.items()))
+                    canonical_url = urls.popleft()
+                    if urls:
+                        self._queues.move_to_end(query)
+                    else:
+                        del self._queues[query]
+                    return canonical_url, self._entries[canonical_url][0]
+                if not self._searching:
+                    break
+                self._ready.wait()
+            return None
+    
+    def complete(self, canonical_url: str, product: Optional[Product]):
+        """Record a scraped URL and deliver the product to every query that asked for it"""
+        with self.lock:
+            entry = self._entries[canonical_url]
+            entry[2] = True
+            entry[3] = product
+            self.scraped += 1
+            for query, search_result in entry[1]:
+                self.deliveries.put((query, search_result, product))
+                self._outstanding[query] -= 1
+                self._settle(query)
+    
+    def close(self):
+        """Stop handing out URLs"""
+        with self.lock:
+            self._closed = True
+            self._ready.notify_all()
+    
+    def _settle(self, query: str):
+        # Caller holds the lock
+        if query not in self._searching and self._outstanding.get(query) == 0:
+            del self._outstanding[query]
+            self.deliveries.put((query, None, None))
+
+
+def transcode_image(content: bytes, max_size: Tuple[int, int], quality: int) -> bytes:
+    """Resize and re-encode raw image bytes as JPEG.
+
+    Module-level so it can be pickled into a process pool. JPEGs are decoded in
+    draft mode straight at the smallest DCT scale that still covers max_size.
+    """
+    img = Image.open(BytesIO(content))
+    if img.width > max_size[0] or img.height > max_size[1]:
+        if img.format == 'JPEG':
+            img.draft('RGB', max_size)
+        img.thumbnail(max_size, Image.LANCZOS)
+    
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+    
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=quality, optimize=True)
+    return output.getvalue()
+
+
+class DomainSnapshot:
+    """The e-commerce domain lists and the suffix indexes built from them.
+
+    Never modified after construction: a catalog update builds a new snapshot and
+    ScraperCore swaps it in with a single assignment.
+    """
+    __slots__ = ('global_ecommerce_domains', 'domain_region_mapping', 'csv_domains',
+                 'ecommerce_domain_index', 'region_index', 'location_index')
+    
+    def __init__(self, base_domains: List[str], base_regions: Dict[str, str], rows: List[Tuple[str, Optional[str]]]):
+        known = set(base_domains)
+        csv_domains = []
+        domain_region_mapping = dict(base_regions)
+        for domain, region in rows:
+            if domain in known:
+                continue
+            known.add(domain)
+            csv_domains.append(domain)
+            if region and domain not in domain_region_mapping:
+                domain_region_mapping[domain] = region
+        
+        self.global_ecommerce_domains = list(base_domains) + csv_domains
+        self.domain_region_mapping = domain_region_mapping
+        self.csv_domains = csv_domains
+        
+        # Suffix indexes behind relevance, region and location lookups
+        self.ecommerce_domain_index = DomainSuffixIndex(self.global_ecommerce_domains)
+        self.region_index = DomainSuffixIndex(REGION_TLDS)
+        self.region_index.update(domain_region_mapping)
+        self.location_index = DomainSuffixIndex(LOCATION_TLDS)
+        self.location_index.update(LOCATION_DOMAINS)
+
+
+def _snapshot_field(name: str) -> property:
+    return property(lambda self: getattr(self.domains, name), doc=f"{name} of the current DomainSnapshot")
+
+
+class ScraperCore:
+    """Process-wide state shared by ProductScraper instances.
+
+    Holds what is expensive to build or worth sharing: the domain catalog and its
+    indexes, the connection pool and per-host politeness limits, the response, parse
+    and product caches, the image store and the image worker pools. All of it is
+    thread-safe, so one core can serve every Streamlit session while settings and
+    progress stay on each ProductScraper.
+    """
+    
+    # Views of the current snapshot; code reading more than one should take self.domains once
+    global_ecommerce_domains = _snapshot_field('global_ecommerce_domains')
+    domain_region_mapping = _snapshot_field('domain_region_mapping')
+    csv_domains = _snapshot_field('csv_domains')
+    ecommerce_domain_index = _snapshot_field('ecommerce_domain_index')
+    region_index = _snapshot_field('region_index')
+    location_index = _snapshot_field('location_index')
+    
+    def __init__(self, cache_dir: Optional[str] = DEFAULT_CACHE_DIR, refresh_domain_catalog: bool = True):
+        self.session_pool = SessionPool(headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             'Accept-Language': 'en-US,en;q=0.9,es;q=0.8,fr;q=0.7,de;q=0.6,it;q=0.5,pt;q=0.4,ru;q=0.3,ja;q=0.2,ko;q=0.1,ar;q=0.1,hi;q=0.1',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
@@ -35,7 +1843,7 @@ class ProductScraper:
         })
         
         # Base global e-commerce sites and marketplaces
-        self.global_ecommerce_domains = [
+        self._base_ecommerce_domains = [
             # Major global platforms
             'amazon.com', 'amazon.co.uk', 'amazon.de', 'amazon.fr', 'amazon.it', 'amazon.es', 
             'amazon.in', 'amazon.co.jp', 'amazon.com.au', 'amazon.ca', 'amazon.com.mx', 
@@ -74,12 +1882,8 @@ class ProductScraper:
             'temu.com', 'shein.com', 'ikea.com', 'apple.com', 'samsung.com'
         ]
         
-        # Load additional domains from CSV - this will be the main source
-        self.csv_domains = []
-        self._load_domains_from_csv()
-        
         # Enhanced domain to region mapping
-        self.domain_region_mapping = {
+        self._base_domain_regions = {
             # North America
             'amazon.com': 'us-en', 'walmart.com': 'us-en', 'target.com': 'us-en',
             'bestbuy.com': 'us-en', 'ebay.com': 'us-en', 'amazon.ca': 'ca-en',
@@ -111,6 +1915,144 @@ class ProductScraper:
             'amazon.com.mx': 'mx-es', 'amazon.com.br': 'br-pt'
         }
         
+        # Additional domains come from the local domain catalog, the main source, or the seed
+        # shipped with the code until one has been downloaded. A missing or stale catalog is
+        # downloaded in the background and swapped in when it arrives.
+        self.domain_catalog = DomainCatalog(os.path.join(cache_dir, 'domain_catalog.json') if cache_dir else None)
+        self.domain_catalog.load()
+        self.apply_domain_catalog(self.domain_catalog.rows)
+        if refresh_domain_catalog and self.domain_catalog.is_stale():
+            self.domain_catalog.refresh_in_background(self.apply_domain_catalog)
+        
+        # Per-host politeness instead of a global delay - tune with politeness.set_domain_limit()
+        self.politeness = PolitenessScheduler(default_rate=2.0, default_burst=4, default_concurrency=4)
+        self.politeness.set_domain_limit(DDGS_HOST, rate=2.0, burst=4, concurrency=4)  # ProductScraper.ddgs_concurrency
+        
+        # Image fetch threads, the fetches remembered by URL and the transcoding processes
+        self.image_workers = 8
+        self.image_cache_size = 2000  # Image fetches remembered by URL and transcode options
+        self.image_executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.image_workers)
+        # Transcoding is CPU-bound, so it runs in worker processes; 0 keeps it in the calling thread.
+        # Capped because the pool is per core, and a few processes keep up with the image fetches
+        self.image_transcode_processes = min(os.cpu_count() or 1, 4)
+        self.transcode_pool = None
+        self.transcode_lock = threading.Lock()
+        self.image_futures = OrderedDict()
+        self.image_lock = threading.Lock()
+        
+        self.response_cache = ResponseCache(os.path.join(cache_dir, 'responses.sqlite')) if cache_dir else None
+        self.parse_cache = ParseCache(os.path.join(cache_dir, 'parsed.sqlite'), ProductScraper.extractor_version()) if cache_dir else None
+        # Thumbnails live on disk; products only carry their image_key. Without a cache_dir they go
+        # to a temporary directory removed with the core, or at exit at the latest
+        self.image_tempdir = None if cache_dir else tempfile.TemporaryDirectory(prefix='smartscrape-')
+        self.image_store = ImageStore(os.path.join(cache_dir or self.image_tempdir.name, 'images'))
+        self.url_cache = URLCache(max_entries=1000, ttl=3600)  # Recently scraped products
+    
+    def apply_domain_catalog(self, rows: List[Tuple[str, Optional[str]]]):
+        """Merge catalog rows into the built-in domain lists and swap in the new snapshot"""
+        # One assignment, so searches on other threads see either the old snapshot or the new one
+        self.domains = DomainSnapshot(self._base_ecommerce_domains, self._base_domain_regions, rows)
+        if self.domains.csv_domains:
+            logger.info(f"Loaded {len(self.domains.csv_domains)} additional domains from the domain catalog "
+                        f"(Total: {len(self.domains.global_ecommerce_domains)})")
+    
+    def disable_transcode_pool(self, error: Exception):
+        logger.warning(f"Image process pool unavailable, transcoding in-thread from now on: {error}")
+        with self.transcode_lock:
+            pool, self.transcode_pool = self.transcode_pool, None
+            self.image_transcode_processes = 0
+        if pool is not None:
+            pool.shutdown(wait=False)
+    
+    def get_transcode_pool(self) -> Optional[concurrent.futures.ProcessPoolExecutor]:
+        """Create the transcoding process pool on first use"""
+        if not self.image_transcode_processes:
+            return None
+        
+        with self.transcode_lock:
+            if self.transcode_pool is None and self.image_transcode_processes:
+                try:
+                    # Never fork: the pool starts from an image thread while other threads may hold
+                    # locks (caches, politeness, DNS), and a forked child would inherit them locked.
+                    # Workers only need the module-level transcode_image, so a fresh interpreter will do.
+                    # As with any spawned pool, a script using it needs an if __name__ == '__main__' guard
+                    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                    self.transcode_pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.image_transcode_processes,
+                        mp_context=multiprocessing.get_context(start_method)
+                    )
+                except (OSError, ValueError, NotImplementedError) as e:
+                    logger.warning(f"Could not start image process pool, transcoding in-thread: {e}")
+                    self.image_transcode_processes = 0
+            return self.transcode_pool
+
+
+_shared_cores = {}
+_shared_cores_lock = threading.Lock()
+
+
+def get_shared_core(cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> ScraperCore:
+    """Process-wide ScraperCore for cache_dir, created on first use"""
+    with _shared_cores_lock:
+        core = _shared_cores.get(cache_dir)
+        if core is None:
+            core = _shared_cores[cache_dir] = ScraperCore(cache_dir)
+        return core
+
+
+def _shared(name: str) -> property:
+    return property(lambda self: getattr(self.core, name), doc=f"{name} of the ScraperCore this scraper runs on")
+
+
+class ProductScraper:
+    _extractor_version = None
+    
+    # Shared state lives on the core; settings and progress are per scraper
+    session_pool = _shared('session_pool')
+    politeness = _shared('politeness')
+    response_cache = _shared('response_cache')
+    parse_cache = _shared('parse_cache')
+    url_cache = _shared('url_cache')
+    image_store = _shared('image_store')
+    domain_catalog = _shared('domain_catalog')
+    domains = _shared('domains')
+    global_ecommerce_domains = _shared('global_ecommerce_domains')
+    domain_region_mapping = _shared('domain_region_mapping')
+    csv_domains = _shared('csv_domains')
+    ecommerce_domain_index = _shared('ecommerce_domain_index')
+    region_index = _shared('region_index')
+    location_index = _shared('location_index')
+    
+    def __init__(self, fetch_engine: str = 'threads', cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+                 parser_backend: Optional[str] = None, refresh_domain_catalog: bool = True,
+                 core: Optional[ScraperCore] = None):
+        if fetch_engine not in FETCH_ENGINES:
+            raise ValueError(f"Unknown fetch engine '{fetch_engine}', expected one of {FETCH_ENGINES}")
+        if fetch_engine == 'asyncio' and not AIOHTTP_AVAILABLE:
+            logger.warning("aiohttp not installed, falling back to the threads fetch engine. Install with: pip install aiohttp")
+            fetch_engine = 'threads'
+        self.fetch_engine = fetch_engine
+        
+        # Parser used by _build_product, can be switched at runtime
+        if parser_backend is None:
+            parser_backend = 'lxml' if LXML_AVAILABLE else 'html.parser'
+        self.parser_backend = parser_backend
+        # 'single_pass' walks the DOM once for all fields, 'per_field' runs each extractor's selectors in turn.
+        # Both give the same fields (tests/test_extraction.py); single_pass is faster on either backend
+        self.extraction_strategy = 'single_pass'
+        # Read JSON-LD / OpenGraph / microdata before falling back to CSS heuristics
+        self.use_structured_data = True
+        
+        # Streaming page downloads stop once the required fields have been seen or the budget is spent
+        self.streaming_fetch = False
+        self.stream_byte_budget = 512 * 1024
+        self.stream_chunk_size = 16 * 1024
+        # Every field by default: stopping earlier would leave the rest to a page that was cut off
+        self.stream_required_fields = tuple(FIELD_SELECTORS)
+        
+        # A private core unless one is passed in, e.g. from get_shared_core()
+        self.core = core if core is not None else ScraperCore(cache_dir, refresh_domain_catalog)
+        
         # Simplified search regions for better performance
         self.search_regions = [
             'us-en', 'uk-en', 'de-de', 'fr-fr', 'es-es', 'it-it', 'nl-nl', 'ca-en',
@@ -120,16 +2062,22 @@ class ProductScraper:
         
         # Default settings - optimized for maximum results
         self.max_workers = 8  # Increased for more aggressive searching
-        self.request_delay = (0.3, 0.8)  # Reduced delay for faster processing
         self.max_retries = 2
         self.timeout = 8
         self.search_timeout = 6
         self.image_fetch_timeout = 8
         self.max_image_size = (600, 600)
         self.image_quality = 80
+        # Images are fetched off the scraping path: 'lazy' waits until a UI asks for them (see
+        # prefetch_images), 'prefetch' starts every one in the background as products are scraped,
+        # 'inline' fetches during the scrape
+        self.image_mode = 'lazy'
+        self.async_concurrency = 200  # In-flight requests for the asyncio engine
+        self.pipeline_queue_size = 64  # Search results / products buffered between pipeline stages
+        self.batch_search_concurrency = 4  # Queries searched at the same time by the batch API
+        self.pipeline_poll_interval = 0.1
         
         # Cache and progress tracking
-        self.url_cache = set()
         self.progress_lock = threading.Lock()
         self.progress = {
             'search_completed': 0,
@@ -151,43 +2099,57 @@ class ProductScraper:
             self._search_with_fallback_terms_extensive
         ]
         
-    def _load_domains_from_csv(self):
-        """Load additional domains from the provided CSV file"""
-        try:
-            csv_url = "https://hebbkx1anhila5yf.public.blob.vercel-storage.com/global_ecommerce_domains_extended-tkAgUrtheYUbHJAxoo6imNFJsbmvKA.csv"
-            response = requests.get(csv_url, timeout=15)
-            if response.status_code == 200:
-                csv_data = response.content.decode('utf-8')
-                csv_reader = csv.DictReader(io.StringIO(csv_data))
-                
-                for row in csv_reader:
-                    domain = row.get('Domain', '').strip()
-                    if domain and domain not in self.global_ecommerce_domains:
-                        self.csv_domains.append(domain)
-                        self.global_ecommerce_domains.append(domain)
-                        
-                        # Add to region mapping if region info is available
-                        region = row.get('Region', '').strip()
-                        language_code = row.get('Language Code', '').strip()
-                        if region and language_code and domain not in self.domain_region_mapping:
-                            # Map region names to language codes
-                            region_mapping = {
-                                'North America': 'us-en',
-                                'Europe': 'uk-en',
-                                'South Asia': 'in-en',
-                                'East Asia': 'jp-jp',
-                                'Middle East': 'ae-en',
-                                'Latin America': 'br-pt',
-                                'Africa': 'za-en',
-                                'Oceania': 'au-en'
-                            }
-                            mapped_region = region_mapping.get(region, language_code.lower())
-                            self.domain_region_mapping[domain] = mapped_region
-                
-                logger.info(f"Loaded {len(self.csv_domains)} additional domains from CSV (Total: {len(self.global_ecommerce_domains)})")
-                
-        except Exception as e:
-            logger.warning(f"Could not load additional domains from CSV: {e}")
+    @property
+    def parser_backend(self) -> str:
+        """Parser used by _build_product"""
+        return self._parser_backend
+    
+    @parser_backend.setter
+    def parser_backend(self, backend: str):
+        # Rejected here rather than per page, where the scrape error handling would swallow it
+        if backend not in PARSER_BACKENDS:
+            raise ValueError(f"Unknown parser backend '{backend}', expected one of {PARSER_BACKENDS}")
+        self._parser_backend = backend
+    
+    @property
+    def ddgs_concurrency(self) -> int:
+        """DuckDuckGo queries in flight, the duckduckgo.com politeness limit shared through the core"""
+        return self.politeness.limits_for(DDGS_HOST)['concurrency']
+    
+    @ddgs_concurrency.setter
+    def ddgs_concurrency(self, concurrency: int):
+        limits = self.politeness.limits_for(DDGS_HOST)
+        self.politeness.set_domain_limit(DDGS_HOST, rate=limits['rate'], burst=limits['burst'], concurrency=concurrency)
+    
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session for the calling thread"""
+        return self.session_pool.get()
+    
+    def get_cache_stats(self) -> Dict:
+        """Get response, parse, URL cache and image store statistics"""
+        return {
+            'responses': self.response_cache.get_stats() if self.response_cache else {},
+            'parsed': self.parse_cache.get_stats() if self.parse_cache else {},
+            'products': self.url_cache.get_stats(),
+            'images': self.image_store.get_stats()
+        }
+    
+    @classmethod
+    def extractor_version(cls) -> str:
+        """Fingerprint of the extraction code, used to invalidate the parse cache"""
+        if cls._extractor_version is None:
+            try:
+                source = inspect.getsource(sys.modules[__name__])
+            except (OSError, TypeError):
+                logger.warning("Scraper source unavailable, the parse cache only follows EXTRACTOR_VERSION")
+                source = ''
+            cls._extractor_version = extractor_fingerprint(source)
+        return cls._extractor_version
+    
+    def get_connection_stats(self) -> Dict:
+        """Get keep-alive reuse and DNS cache statistics"""
+        return self.session_pool.get_stats()
     
     def get_progress(self):
         """Get current progress information"""
@@ -213,72 +2175,90 @@ class ProductScraper:
             search_completed=0
         )
         
-        all_results = []
-        seen_urls = set()
+        all_results = list(self.iter_search_results(query, category, max_results, progress_callback))
         
+        self.update_progress(
+            status='search_complete',
+            message=f"Search complete. Found {len(all_results)} results."
+        )
+        
+        logger.info(f"Final search results: {len(all_results)} products found")
+        return all_results
+    
+    def iter_search_results(self, query: str, category: str = 'general', max_results: int = 100,
+                            progress_callback=None) -> Iterator[Dict]:
+        """Run every search method at once and yield unique results as their order is settled"""
         # Calculate results needed per method
         results_per_method = max(50, max_results // len(self.search_methods))
         
-        # Try all search methods aggressively
-        for method_index, search_method in enumerate(self.search_methods):
-            if len(all_results) >= max_results:
-                break
-                
-            try:
-                self.update_progress(
-                    message=f"Method {method_index + 1}/{len(self.search_methods)}: {search_method.__name__}..."
-                )
-                
-                needed_results = max_results - len(all_results)
-                method_results = search_method(query, category, min(results_per_method, needed_results))
-                
-                # Add only unique results
-                new_results = 0
-                for result in method_results:
-                    if result['url'] not in seen_urls:
-                        seen_urls.add(result['url'])
-                        all_results.append(result)
-                        new_results += 1
-                
-                logger.info(f"Method {method_index + 1} ({search_method.__name__}) found {new_results} new results (Total: {len(all_results)})")
+        collector = SearchCollector(len(self.search_methods), max_results)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(self.search_methods))
+        futures = [
+            executor.submit(self._run_search_method, index, search_method, query, category,
+                            min(results_per_method, max_results), collector)
+            for index, search_method in enumerate(self.search_methods)
+        ]
+        
+        found = 0
+        try:
+            while True:
+                ready = collector.take_ready()
+                if ready is None:
+                    break
+                for result in ready:
+                    yield result
+                found += len(ready)
                 
                 self.update_progress(
-                    search_completed=len(all_results),
-                    message=f"Found {len(all_results)}/{max_results} results..."
+                    search_completed=found,
+                    message=f"Found {found}/{max_results} results..."
                 )
                 
                 if progress_callback:
                     progress_callback(self.get_progress())
-                
-                # Small delay between methods
-                time.sleep(0.5)
-                
-            except Exception as e:
-                logger.error(f"Error in search method {method_index + 1}: {e}")
-                continue
+        finally:
+            # Methods still running see the collector is done and stop at their next result
+            collector.close()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
         
         # If still not enough results, try intensive variations
-        if len(all_results) < max_results * 0.8:  # If less than 80% of target
-            logger.info(f"Only found {len(all_results)}/{max_results} results. Trying intensive search...")
+        if found < max_results * 0.8:  # If less than 80% of target
+            logger.info(f"Only found {found}/{max_results} results. Trying intensive search...")
             self.update_progress(
-                message=f"Intensive search: {len(all_results)}/{max_results} found, trying more variations..."
+                message=f"Intensive search: {found}/{max_results} found, trying more variations..."
             )
             
-            intensive_results = self._intensive_search_variations(query, category, max_results - len(all_results), seen_urls)
-            all_results.extend(intensive_results)
-        
-        self.update_progress(
-            status='search_complete',
-            message=f"Search complete. Found {len(all_results)} results."
-        )
-        
-        logger.info(f"Final search results: {len(all_results)} products found")
-        return all_results[:max_results]
+            intensive_results = self._intensive_search_variations(query, category, max_results - found, collector.seen_urls())
+            yield from intensive_results[:max_results - found]
     
-    def _search_with_ddgs_aggressive(self, query: str, category: str, max_results: int) -> List[Dict]:
-        """Aggressive DuckDuckGo search with many variations"""
-        results = []
-        
+    def _run_search_method(self, index: int, search_method, query: str, category: str, max_results: int,
+                           collector: SearchCollector):
+        """Feed one search method's results into the collector until it is done"""
+        try:
+            results = search_method(query, category, max_results)
+            try:
+                for result in results:
+                    if not collector.emit(index, result):
+                        break
+            finally:
+                # Stop generator-based methods immediately rather than at garbage collection
+                close = getattr(results, 'close', None)
+                if close:
+                    close()
+        except Exception as e:
+            logger.error(f"Error in search method {index + 1}: {e}")
+        finally:
+            collector.finish(index)
+            logger.info(f"Method {index + 1} ({search_method.__name__}) found {collector.method_count(index)} new results (Total: {len(collector)})")
+    
+    def _search_with_ddgs_aggressive(self, query: str, category: str, max_results: int) -> Iterable[Dict]:
+        """Aggressive DuckDuckGo search with many variations.
+
+        Queries fan out over one shared DDGS client, at most ddgs_concurrency at a
+        time, and relevant results are yielded as each query returns.
+        """
         # More comprehensive query variations
         query_variations = [
             query,
@@ -314,55 +2294,65 @@ class ProductScraper:
         
         # Use more variations based on max_results
         variations_to_use = min(len(query_variations), max(8, max_results // 20))
+        pending_variations = deque(query_variations[:variations_to_use])
+        results_per_query = min(30, max_results)
         
-        for variation in query_variations[:variations_to_use]:
-            if len(results) >= max_results:
-                break
-                
-            try:
-                logger.info(f"DuckDuckGo search: '{variation}'")
-                
-                ddgs = DDGS()
-                # Increase results per query
-                results_per_query = min(30, max_results - len(results))
-                search_results = ddgs.text(
-                    variation,
-                    max_results=results_per_query,
-                    timeout=4
-                )
-                
-                for result in search_results:
-                    url = result.get('href', '')
-                    title = result.get('title', '')
-                    snippet = result.get('body', '')
-                    
-                    if self._is_relevant_result(url, title, snippet):
-                        results.append({
-                            'title': title,
-                            'url': url,
-                            'snippet': snippet,
-                            'region': 'global',
-                            'source': 'ddgs'
-                        })
-                        
-                        if len(results) >= max_results:
-                            break
-                
-                # Shorter delay for more aggressive searching
-                time.sleep(0.3)
-                
-            except Exception as e:
-                logger.warning(f"DuckDuckGo search failed for '{variation}': {e}")
-                continue
+        ddgs = DDGS(timeout=self.search_timeout)
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.ddgs_concurrency)
+        in_flight = {}
+        found = 0
         
-        return results
+        try:
+            while pending_variations or in_flight:
+                # Keep the pool busy without queuing variations we may never need
+                while pending_variations and len(in_flight) < self.ddgs_concurrency:
+                    variation = pending_variations.popleft()
+                    in_flight[executor.submit(self._ddgs_text, ddgs, variation, results_per_query)] = variation
+                
+                completed, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    variation = in_flight.pop(future)
+                    try:
+                        search_results = future.result()
+                    except Exception as e:
+                        logger.warning(f"DuckDuckGo search failed for '{variation}': {e}")
+                        continue
+                    
+                    for result in search_results or []:
+                        url = result.get('href', '')
+                        title = result.get('title', '')
+                        snippet = result.get('body', '')
+                        
+                        if self._is_relevant_result(url, title, snippet):
+                            yield {
+                                'title': title,
+                                'url': url,
+                                'snippet': snippet,
+                                'region': 'global',
+                                'source': 'ddgs'
+                            }
+                            found += 1
+                            
+                            if found >= max_results:
+                                return
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _ddgs_text(self, ddgs: DDGS, variation: str, max_results: int) -> List[Dict]:
+        """Run one DuckDuckGo text query inside the shared DuckDuckGo rate limit"""
+        with self.politeness.slot(DDGS_RATE_KEY):
+            logger.info(f"DuckDuckGo search: '{variation}'")
+            return ddgs.text(variation, max_results=max_results)
     
     def _search_with_csv_domains_comprehensive(self, query: str, category: str, max_results: int) -> List[Dict]:
         """Comprehensive search using all CSV domains"""
         results = []
+        domains = self.domains  # One snapshot for the whole search
         
         # Use a large subset of CSV domains
-        domains_to_use = self.csv_domains[:min(200, max_results)]  # Use up to 200 domains
+        domains_to_use = domains.csv_domains[:min(200, max_results)]  # Use up to 200 domains
         
         # Common search URL patterns
         search_patterns = [
@@ -398,7 +2388,7 @@ class ProductScraper:
                             'title': f"{query} - {domain}",
                             'url': url,
                             'snippet': f"Search results for {query} on {domain}",
-                            'region': self.domain_region_mapping.get(domain, 'international'),
+                            'region': domains.domain_region_mapping.get(domain, 'international'),
                             'source': 'csv_domains'
                         })
                         
@@ -700,7 +2690,8 @@ class ProductScraper:
         ]
         
         # Add more sites from CSV
-        additional_sites = self.csv_domains[200:500] if len(self.csv_domains) > 200 else self.csv_domains
+        domains = self.domains  # One snapshot for the whole search
+        additional_sites = domains.csv_domains[200:500] if len(domains.csv_domains) > 200 else domains.csv_domains
         
         for variation in intensive_variations:
             if len(results) >= needed_results:
@@ -720,7 +2711,7 @@ class ProductScraper:
                             'title': f"{variation} - {site}",
                             'url': url,
                             'snippet': f"Intensive search for {variation} on {site}",
-                            'region': self.domain_region_mapping.get(site, 'international'),
+                            'region': domains.domain_region_mapping.get(site, 'international'),
                             'source': 'intensive'
                         })
                         seen_urls.add(url)
@@ -737,7 +2728,7 @@ class ProductScraper:
         snippet_lower = snippet.lower()
         
         # Check for e-commerce domains
-        if any(domain in url_lower for domain in self.global_ecommerce_domains):
+        if urlparse(url).netloc in self.ecommerce_domain_index:
             return True
         
         # Check for commerce-related keywords
@@ -755,17 +2746,23 @@ class ProductScraper:
         # More lenient for getting more results
         return keyword_count >= 1
     
-    def scrape_products_parallel(self, search_results: List[Dict], max_workers: int = None, progress_callback=None) -> List[Dict]:
+    def scrape_products_parallel(self, search_results: List[Dict], max_workers: int = None, progress_callback=None) -> List[Product]:
         """Enhanced parallel scraping with better error handling"""
+        return list(self.iter_scrape_products(search_results, max_workers, progress_callback))
+    
+    def iter_scrape_products(self, search_results: List[Dict], max_workers: int = None,
+                             progress_callback=None) -> Iterator[Product]:
+        """Scrape search results in parallel, yielding each product as soon as it is scraped"""
         if not search_results:
-            return []
+            return
+        if self.image_mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode '{self.image_mode}', expected one of {IMAGE_MODES}")
             
         if max_workers is None:
             max_workers = min(self.max_workers, len(search_results))
         
-        products = []
-        successful = 0
-        failed = 0
+        # Spread hosts across the queue so workers are not all parked on one rate-limited host
+        search_results = self._interleave_by_host(search_results)
         
         self.update_progress(
             status='scraping',
@@ -774,56 +2771,560 @@ class ProductScraper:
             message=f"Starting to scrape {len(search_results)} products..."
         )
         
-        logger.info(f"Starting parallel scraping of {len(search_results)} products with {max_workers} workers")
-        
-        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # Submit scraping tasks
-            future_to_result = {
-                executor.submit(self._scrape_with_timeout, result['url']): result 
-                for result in search_results
-            }
-            
-            # Collect results as they complete
-            for future in concurrent.futures.as_completed(future_to_result):
-                search_result = future_to_result[future]
-                try:
-                    product = future.result(timeout=self.timeout)
-                    if product:
-                        # Add search metadata
-                        product['search_title'] = search_result['title']
-                        product['search_snippet'] = search_result['snippet']
-                        product['search_region'] = search_result.get('region', 'unknown')
-                        product['search_source'] = search_result.get('source', 'unknown')
-                        products.append(product)
-                        successful += 1
-                        
-                        self.update_progress(
-                            scrape_completed=successful + failed,
-                            message=f"Scraped {successful} products successfully..."
-                        )
-                        
-                        if progress_callback:
-                            progress_callback(self.get_progress())
-                            
-                        logger.info(f"✓ Successfully scraped: {product['name'][:50]}... ({successful}/{len(search_results)})")
-                    else:
-                        failed += 1
-                        self.update_progress(scrape_completed=successful + failed)
-                        
-                except Exception as e:
-                    failed += 1
-                    self.update_progress(scrape_completed=successful + failed)
-                    logger.warning(f"✗ Failed to scrape: {search_result['url'][:50]}... ({failed} failures)")
+        if self.fetch_engine == 'asyncio':
+            logger.info(f"Starting asyncio scraping of {len(search_results)} products with {self.async_concurrency} concurrent requests")
+            completions = self._iter_scrape_async(search_results)
+        else:
+            logger.info(f"Starting parallel scraping of {len(search_results)} products with {max_workers} workers")
+            completions = self._iter_scrape_threads(search_results, max_workers)
         
+        completed = successful = 0
+        try:
+            for search_result, product in completions:
+                completed += 1
+                if product:
+                    successful += 1
+                self._record_scraped_product(product, search_result, completed, successful, progress_callback)
+                if product:
+                    yield product
+        finally:
+            completions.close()
+        
+        failed = completed - successful
         self.update_progress(
             status='scraping_complete',
             message=f"Scraping complete: {successful} successful, {failed} failed"
         )
         
         logger.info(f"Parallel scraping completed: {successful} successful, {failed} failed")
+    
+    def _iter_scrape_threads(self, search_results: List[Dict], max_workers: int) -> Iterator[Tuple[Dict, Optional[Product]]]:
+        """Scrape on a thread pool, yielding (search_result, product) pairs in completion order"""
+        pending = iter(search_results)
+        in_flight = {}
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        
+        try:
+            while True:
+                # A small window of submitted work keeps memory flat however many results there are
+                while len(in_flight) < max_workers * 2:
+                    search_result = next(pending, None)
+                    if search_result is None:
+                        break
+                    in_flight[executor.submit(self._scrape_with_timeout, search_result['url'])] = search_result
+                
+                if not in_flight:
+                    break
+                
+                completed, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in completed:
+                    search_result = in_flight.pop(future)
+                    try:
+                        product = future.result()
+                    except Exception as e:
+                        product = None
+                        logger.warning(f"✗ Failed to scrape: {search_result['url'][:50]}... ({e})")
+                    yield search_result, product
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _iter_scrape_async(self, search_results: List[Dict]) -> Iterator[Tuple[Dict, Optional[Product]]]:
+        """Run the asyncio engine on a helper thread, yielding (search_result, product) pairs as they complete"""
+        # Bounded, so a slow consumer holds back the scrape instead of letting products pile up
+        completions = queue.Queue(maxsize=self.async_concurrency)
+        stop = threading.Event()
+        
+        def emit(item):
+            # Wait for room, but give up once the consumer has gone
+            while not stop.is_set():
+                try:
+                    completions.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+        
+        def run():
+            try:
+                self._run_async(self._scrape_products_async(search_results, emit, stop))
+            except Exception as e:
+                logger.error(f"Asyncio scraping failed: {e}")
+            finally:
+                emit(None)
+        
+        threading.Thread(target=run, daemon=True).start()
+        try:
+            while True:
+                item = completions.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            stop.set()
+    
+    def _interleave_by_host(self, search_results: List[Dict]) -> List[Dict]:
+        """Drop results whose canonical URL repeats and reorder the rest round-robin across hosts"""
+        by_host = {}
+        seen = set()
+        for result in search_results:
+            canonical_url = canonicalize_url(result['url'])
+            if canonical_url in seen:
+                continue
+            seen.add(canonical_url)
+            by_host.setdefault(urlsplit(canonical_url).netloc, []).append(result)
+        
+        interleaved = []
+        queues = list(by_host.values())
+        for i in range(max((len(q) for q in queues), default=0)):
+            interleaved.extend(q[i] for q in queues if i < len(q))
+        return interleaved
+    
+    def _record_scraped_product(self, product: Optional[Product], search_result: Dict, completed: int, successful: int,
+                                progress_callback=None):
+        """Attach search metadata to a finished scrape and report progress"""
+        if product:
+            # Add search metadata
+            product.search_title = search_result['title']
+            product.search_snippet = search_result['snippet']
+            product.search_region = search_result.get('region', 'unknown')
+            product.search_source = search_result.get('source', 'unknown')
+            
+            self.update_progress(
+                scrape_completed=completed,
+                message=f"Scraped {successful} products successfully..."
+            )
+            
+            if progress_callback:
+                progress_callback(self.get_progress())
+                
+            logger.info(f"✓ Successfully scraped: {product.name[:50]}... ({successful}/{completed})")
+        else:
+            self.update_progress(scrape_completed=completed)
+    
+    def iter_search_and_scrape(self, query: str, category: str = 'general', max_results: int = 100,
+                               max_workers: int = None, progress_callback=None) -> Iterator[Product]:
+        """Search and scrape as one pipeline, yielding products as they are scraped.
+
+        Search results go through a bounded queue straight to the scraping workers,
+        so scraping starts with the first URL found instead of after the whole
+        search. When the workers or the caller fall behind, the search waits.
+        """
+        if self.image_mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode '{self.image_mode}', expected one of {IMAGE_MODES}")
+        logger.info(f"Starting pipelined search and scrape for: '{query}' with target: {max_results} results")
+        max_workers = max_workers or self.max_workers
+        url_queue = queue.Queue(maxsize=self.pipeline_queue_size)
+        product_queue = queue.Queue(maxsize=self.pipeline_queue_size)
+        stop = threading.Event()
+        
+        self.update_progress(
+            status='searching',
+            message=f"Searching for '{query}' - Target: {max_results} results",
+            search_total=max_results,
+            search_completed=0,
+            scrape_total=0,
+            scrape_completed=0
+        )
+        
+        threads = [threading.Thread(target=self._pipeline_search, daemon=True,
+                                    args=(query, category, max_results, url_queue, max_workers, stop))]
+        threads += [
+            threading.Thread(target=self._pipeline_scrape_worker, args=(url_queue, product_queue, stop), daemon=True)
+            for _ in range(max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        completed = successful = 0
+        workers_running = max_workers
+        try:
+            while workers_running:
+                item = product_queue.get()
+                if item is None:
+                    workers_running -= 1
+                    continue
+                
+                search_result, product = item
+                completed += 1
+                if product:
+                    successful += 1
+                self._record_scraped_product(product, search_result, completed, successful, progress_callback)
+                if product:
+                    yield product
+        finally:
+            # Also reached when the caller stops iterating early
+            stop.set()
+        
+        self.update_progress(
+            status='scraping_complete',
+            message=f"Scraping complete: {successful} successful, {completed - successful} failed"
+        )
+        logger.info(f"Pipelined scraping completed: {successful} successful, {completed - successful} failed")
+    
+    def _pipeline_search(self, query: str, category: str, max_results: int, url_queue: queue.Queue,
+                         worker_count: int, stop: threading.Event):
+        """Producer side of iter_search_and_scrape: push search results into the URL queue"""
+        queued = 0
+        seen = set()
+        results = self.iter_search_results(query, category, max_results)
+        try:
+            for result in results:
+                # Near-identical URLs would scrape the same page twice
+                canonical_url = canonicalize_url(result['url'])
+                if canonical_url in seen:
+                    continue
+                seen.add(canonical_url)
+                
+                if not self._put_until_stopped(url_queue, result, stop):
+                    break
+                queued += 1
+                self.update_progress(scrape_total=queued)
+        except Exception as e:
+            logger.error(f"Search failed during pipelined scrape: {e}")
+        finally:
+            results.close()
+            self.update_progress(status='scraping', message=f"Search complete. Found {queued} results.")
+            # One end marker per worker
+            for _ in range(worker_count):
+                self._put_until_stopped(url_queue, None, stop)
+    
+    def _pipeline_scrape_worker(self, url_queue: queue.Queue, product_queue: queue.Queue, stop: threading.Event):
+        """Consumer side of iter_search_and_scrape: scrape queued URLs until the end marker"""
+        try:
+            while not stop.is_set():
+                try:
+                    search_result = url_queue.get(timeout=self.pipeline_poll_interval)
+                except queue.Empty:
+                    continue
+                if search_result is None:
+                    break
+                
+                product = self._scrape_with_timeout(search_result['url'])
+                if not self._put_until_stopped(product_queue, (search_result, product), stop):
+                    break
+        finally:
+            self._put_until_stopped(product_queue, None, stop)
+    
+    def search_and_scrape_batch(self, queries: Iterable[str], category: str = 'general', max_results: int = 100,
+                                max_workers: int = None, progress_callback=None) -> Dict[str, List[Product]]:
+        """Search and scrape many queries through one shared pool, returning the products of each query"""
+        queries = list(dict.fromkeys(queries))
+        products = {query: [] for query in queries}
+        for query, product in self.iter_batch_search_and_scrape(queries, category, max_results, max_workers, progress_callback):
+            products[query].append(product)
         return products
     
-    def _scrape_with_timeout(self, url: str) -> Optional[Dict]:
+    def iter_batch_search_and_scrape(self, queries: Iterable[str], category: str = 'general', max_results: int = 100,
+                                     max_workers: int = None, progress_callback=None,
+                                     query_callback=None) -> Iterator[Tuple[str, Product]]:
+        """Search and scrape many queries as one pipeline, yielding (query, product) pairs.
+
+        Up to batch_search_concurrency queries are searched at once, and all of them
+        feed one pool of max_workers scraping workers through a BatchScheduler. A URL
+        found by several queries is scraped once and yielded for each of them, with
+        that query's search metadata. query_callback(query) is called once a query
+        has yielded all of its products.
+        """
+        queries = list(dict.fromkeys(queries))
+        if not queries:
+            return
+        if self.image_mode not in IMAGE_MODES:
+            raise ValueError(f"Unknown image mode '{self.image_mode}', expected one of {IMAGE_MODES}")
+        logger.info(f"Starting batch search and scrape for {len(queries)} queries with target: {max_results} results each")
+        max_workers = max_workers or self.max_workers
+        deliveries = queue.Queue()
+        scheduler = BatchScheduler(queries, deliveries)
+        query_queue = queue.Queue()
+        for query in queries:
+            query_queue.put(query)
+        stop = threading.Event()
+        
+        self.update_progress(
+            status='searching',
+            message=f"Searching {len(queries)} queries - Target: {max_results} results each",
+            search_total=max_results * len(queries),
+            search_completed=0,
+            scrape_total=0,
+            scrape_completed=0
+        )
+        
+        threads = [
+            threading.Thread(target=self._batch_search, args=(query_queue, scheduler, category, max_results, stop), daemon=True)
+            for _ in range(min(self.batch_search_concurrency, len(queries)))
+        ]
+        threads += [
+            threading.Thread(target=self._batch_scrape_worker, args=(scheduler, stop), daemon=True)
+            for _ in range(max_workers)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        completed = successful = 0
+        workers_running = max_workers
+        try:
+            while workers_running:
+                item = deliveries.get()
+                if item is None:
+                    workers_running -= 1
+                    continue
+                
+                query, search_result, product = item
+                if search_result is None:
+                    if query_callback:
+                        query_callback(query)
+                    continue
+                
+                # Each query gets its own copy, carrying its own search metadata
+                product = product.copy() if product else None
+                completed += 1
+                if product:
+                    successful += 1
+                self._record_scraped_product(product, search_result, completed, successful, progress_callback)
+                if product:
+                    yield query, product
+        finally:
+            # Also reached when the caller stops iterating early
+            stop.set()
+            scheduler.close()
+        
+        self.update_progress(
+            status='scraping_complete',
+            message=f"Batch complete: {successful} products from {scheduler.scraped} pages for {len(queries)} queries"
+        )
+        logger.info(f"Batch scraping completed: {scheduler.scraped} pages scraped, {successful} products delivered, "
+                    f"{completed - successful} failed")
+    
+    def _batch_search(self, query_queue: queue.Queue, scheduler: BatchScheduler, category: str, max_results: int,
+                      stop: threading.Event):
+        """Search side of iter_batch_search_and_scrape: search queries one after another into the scheduler"""
+        while not stop.is_set():
+            try:
+                query = query_queue.get_nowait()
+            except queue.Empty:
+                break
+            
+            results = self.iter_search_results(query, category, max_results)
+            try:
+                for result in results:
+                    if stop.is_set():
+                        break
+                    scheduler.add(query, result)
+            except Exception as e:
+                logger.error(f"Search failed for '{query}' during batch scrape: {e}")
+            finally:
+                results.close()
+                scheduler.finish_search(query)
+    
+    def _batch_scrape_worker(self, scheduler: BatchScheduler, stop: threading.Event):
+        """Scraping side of iter_batch_search_and_scrape: scrape URLs in the scheduler's order"""
+        try:
+            while not stop.is_set():
+                item = scheduler.take()
+                if item is None:
+                    break
+                canonical_url, url = item
+                scheduler.complete(canonical_url, self._scrape_with_timeout(url))
+        finally:
+            scheduler.deliveries.put(None)
+    
+    def _put_until_stopped(self, target: queue.Queue, item, stop: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is stopped"""
+        while not stop.is_set():
+            try:
+                target.put(item, timeout=self.pipeline_poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def _run_async(self, coro):
+        """Run a coroutine to completion from synchronous code"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(coro)
+        
+        # Already inside an event loop (e.g. a notebook) - run on a helper thread
+        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, coro).result()
+    
+    async def _scrape_products_async(self, search_results: List[Dict], emit, stop: threading.Event):
+        """Scrape all search results on a single event loop with many requests in flight.
+
+        Each (search_result, product) pair is passed to emit as it completes. emit may
+        block, so it runs off the event loop, and new scrapes are only scheduled once it
+        has returned: at most twice async_concurrency scrapes exist at a time. Setting
+        stop schedules nothing more and cancels whatever is still running.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.async_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.async_concurrency, ttl_dns_cache=300)
+        # Let aiohttp negotiate the encodings it can actually decode
+        headers = {k: v for k, v in self.session_pool.headers.items() if k.lower() != 'accept-encoding'}
+        
+        async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
+            pending = iter(search_results)
+            in_flight = set()
+            try:
+                while not stop.is_set():
+                    while len(in_flight) < self.async_concurrency * 2 and not stop.is_set():
+                        search_result = next(pending, None)
+                        if search_result is None:
+                            break
+                        in_flight.add(asyncio.ensure_future(self._scrape_product_page_async(session, semaphore, search_result)))
+                    
+                    if not in_flight:
+                        break
+                    
+                    # Hand results over as they complete
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        await loop.run_in_executor(None, emit, task.result())
+            finally:
+                for task in in_flight:
+                    task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+    
+    async def _scrape_product_page_async(self, session, semaphore: asyncio.Semaphore,
+                                         search_result: Dict) -> Tuple[Dict, Optional[Product]]:
+        """Asyncio counterpart of scrape_product_page_enhanced"""
+        url = search_result['url']
+        product = self.url_cache.get(url)
+        if product is not None:
+            return search_result, product
+        
+        loop = asyncio.get_running_loop()
+        
+        for attempt in range(self.max_retries):
+            try:
+                response = await self._fetch_async(session, semaphore, url, self.timeout, stream=self.streaming_fetch)
+                
+                # Parsing is CPU-bound, keep it off the event loop
+                product = await loop.run_in_executor(None, self._parse_product, url, response)
+                
+                if product['image_url']:
+                    if self.image_mode == 'inline':
+                        try:
+                            product['image_key'] = await self._fetch_and_process_image_async(session, semaphore, product['image_url'])
+                        except Exception:
+                            pass  # Ignore image fetch errors
+                    elif self.image_mode == 'prefetch':
+                        self.prefetch_image(product['image_url'])
+                
+                self.url_cache.put(url, product)
+                return search_result, product
+                
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.max_retries - 1:
+                    logger.warning(f"Failed to scrape {url} after {self.max_retries} attempts")
+                    return search_result, None
+                await asyncio.sleep(1 * (attempt + 1))
+                
+            except Exception as e:
+                logger.warning(f"Error scraping {url}: {e}")
+                return search_result, None
+        
+        return search_result, None
+    
+    async def _fetch_and_process_image_async(self, session, semaphore: asyncio.Semaphore, image_url: str) -> Optional[str]:
+        """Fetch an image on the event loop and process and store it in a worker thread"""
+        try:
+            response = await self._fetch_async(session, semaphore, image_url, self.image_fetch_timeout, binary=True)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(None, self._store_image, response.content)
+            
+        except Exception as e:
+            logger.warning(f"Error fetching image {image_url}: {e}")
+            return None
+    
+    def _fetch(self, url: str, timeout: float, binary: bool = False, stream: bool = False) -> CachedResponse:
+        """GET a URL through the response cache, revalidating stale entries with a conditional request.
+
+        With stream=True the body is read incrementally and the download is cut
+        short once StreamingBodyReader has what it needs; truncated bodies are
+        returned but never cached.
+        """
+        cached = self.response_cache.get(url) if self.response_cache else None
+        if cached and cached.is_fresh():
+            self.response_cache.record_hit()
+            return cached
+        
+        headers = cached.conditional_headers() if cached else {}
+        # Respect the per-host rate and concurrency limits
+        with self.politeness.slot(url):
+            response = self.session.get(url, timeout=timeout, headers=headers, stream=stream)
+            if cached and response.status_code == 304:
+                return self.response_cache.revalidate(cached, response.headers)
+            response.raise_for_status()
+            
+            if stream:
+                reader = StreamingBodyReader(self, url, response.encoding)
+                chunks = response.iter_content(chunk_size=self.stream_chunk_size)
+                for chunk in chunks:
+                    if reader.feed(chunk):
+                        reader.stop(next(chunks, b''))
+                        break
+                # Closing drops the connection if the body was not fully read
+                response.close()
+                if reader.truncated:
+                    logger.info(f"Stopped download of {url} after {reader.size} bytes")
+                    return CachedResponse(url, reader.content, response.encoding or 'utf-8', truncated=True,
+                                          sniffed_fields=reader.fields)
+                content = reader.content
+            else:
+                content = response.content
+        
+        # Not apparent_encoding: a streamed response has no body left to read, only reader.content
+        encoding = None if binary else (response.encoding or detect_encoding(content))
+        if self.response_cache:
+            return self.response_cache.store(url, response.headers, content, encoding)
+        return CachedResponse(url, content, encoding)
+    
+    async def _fetch_async(self, session, semaphore: asyncio.Semaphore, url: str, timeout: float,
+                           binary: bool = False, stream: bool = False) -> CachedResponse:
+        """Asyncio counterpart of _fetch"""
+        # The response cache is blocking SQLite, so its calls run off the event loop
+        loop = asyncio.get_running_loop()
+        cached = await loop.run_in_executor(None, self.response_cache.get, url) if self.response_cache else None
+        if cached and cached.is_fresh():
+            self.response_cache.record_hit()
+            return cached
+        
+        headers = cached.conditional_headers() if cached else {}
+        # Respect the per-host rate and concurrency limits
+        async with self.politeness.slot_async(url), semaphore:
+            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if cached and response.status == 304:
+                    return await loop.run_in_executor(None, self.response_cache.revalidate, cached, response.headers)
+                response.raise_for_status()
+                
+                if stream:
+                    reader = StreamingBodyReader(self, url, response.charset)
+                    async for chunk in response.content.iter_chunked(self.stream_chunk_size):
+                        if reader.feed(chunk):
+                            reader.stop(await response.content.read(self.stream_chunk_size))
+                            break
+                    if reader.truncated:
+                        response.close()
+                        logger.info(f"Stopped download of {url} after {reader.size} bytes")
+                        return CachedResponse(url, reader.content, response.charset or 'utf-8', truncated=True,
+                                              sniffed_fields=reader.fields)
+                    content = reader.content
+                else:
+                    content = await response.read()
+                encoding = None
+                if not binary:
+                    try:
+                        encoding = response.get_encoding()
+                    except Exception:
+                        encoding = 'utf-8'
+        
+        if self.response_cache:
+            return await loop.run_in_executor(None, self.response_cache.store, url, response.headers, content, encoding)
+        return CachedResponse(url, content, encoding)
+    
+    def _scrape_with_timeout(self, url: str) -> Optional[Product]:
         """Scrape a single URL with timeout protection"""
         try:
             return self.scrape_product_page_enhanced(url)
@@ -831,46 +3332,27 @@ class ProductScraper:
             logger.warning(f"Scraping failed for {url}: {e}")
             return None
     
-    def scrape_product_page_enhanced(self, url: str) -> Optional[Dict]:
+    def scrape_product_page_enhanced(self, url: str) -> Optional[Product]:
         """Enhanced product page scraping with better error handling"""
-        if url in self.url_cache:
-            return None
-            
-        self.url_cache.add(url)
+        product = self.url_cache.get(url)
+        if product is not None:
+            return product
         
         for attempt in range(self.max_retries):
             try:
-                # Add delay to be respectful
-                time.sleep(random.uniform(*self.request_delay))
+                response = self._fetch(url, self.timeout, stream=self.streaming_fetch)
+                product = self._parse_product(url, response)
                 
-                response = self.session.get(url, timeout=self.timeout)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                domain = urlparse(url).netloc.lower()
-                region = self._detect_region_from_domain(domain)
-                
-                product = {
-                    'name': self._extract_product_name(soup),
-                    'price': self._extract_product_price(soup),
-                    'location': self._extract_location(url, soup),
-                    'product_url': url,
-                    'image_url': self._extract_image_url(soup, url),
-                    'image_data': None,
-                    'availability': self._extract_availability(soup),
-                    'rating': self._extract_rating(soup),
-                    'description': self._extract_description(soup),
-                    'domain': domain,
-                    'region': region
-                }
-                
-                # Try to fetch image (with timeout)
                 if product['image_url']:
-                    try:
-                        product['image_data'] = self._fetch_and_process_image(product['image_url'])
-                    except:
-                        pass  # Ignore image fetch errors
+                    if self.image_mode == 'inline':
+                        try:
+                            product['image_key'] = self._fetch_and_process_image(product['image_url'])
+                        except:
+                            pass  # Ignore image fetch errors
+                    elif self.image_mode == 'prefetch':
+                        self.prefetch_image(product['image_url'])
                 
+                self.url_cache.put(url, product)
                 return product
                 
             except requests.exceptions.RequestException as e:
@@ -883,217 +3365,515 @@ class ProductScraper:
                 logger.warning(f"Error scraping {url}: {e}")
                 return None
     
+    def _parse_product(self, url: str, response: CachedResponse) -> Product:
+        """Build a product from a response, reusing a cached parse of an identical body"""
+        # A truncated body is only part of the page, so its parse is never cached
+        if not self.parse_cache or response.truncated:
+            product = self._build_product(url, response.text, response.sniffed_fields)
+        else:
+            body_hash = hashlib.sha256(response.content).hexdigest()
+            product = self.parse_cache.get(url, body_hash)
+            if product is None:
+                product = self._build_product(url, response.text)
+                self.parse_cache.store(url, body_hash, product)
+        
+        # Looked up fresh every time, so domain catalog updates apply to cached parses too
+        product.region = self._detect_region_from_domain(product.domain)
+        product.location = self._extract_location(url)
+        return product
+    
+    def _make_soup(self, html: str):
+        """Parse HTML with the configured backend.
+
+        Both backends give the same fields (tests/test_parser_backends.py) except where
+        a page leaves open an element whose end tag HTML implies, such as <p>, <li>,
+        <td> or <option>: lxml closes it like a browser, html.parser keeps it open
+        around the siblings that follow.
+        """
+        if self.parser_backend == 'lxml' and LXML_AVAILABLE:
+            try:
+                return LxmlSoup(html)
+            except (etree.ParserError, ValueError):
+                pass  # e.g. an empty document, let BeautifulSoup handle it
+        return BeautifulSoup(html, 'html.parser')
+    
+    def _build_product(self, url: str, html: str, known_fields: Optional[Dict[str, str]] = None) -> Product:
+        """Parse a downloaded product page into a Product; region and location are left to _parse_product"""
+        soup = self._make_soup(html)
+        domain = urlparse(url).netloc.lower()
+        fields = self._extract_fields(soup, url, known_fields)
+        price_info = self._parse_product_price(fields['price'])
+        
+        return Product(
+            name=fields['name'],
+            price=fields['price'],
+            price_amount=float(price_info.amount) if price_info and price_info.amount is not None else None,
+            price_currency=price_info.currency if price_info else None,
+            product_url=url,
+            image_url=fields['image_url'],
+            availability=fields['availability'],
+            rating=fields['rating'],
+            rating_value=self._parse_rating_value(fields['rating']),
+            description=fields['description'],
+            domain=domain
+        )
+    
+    def _parse_rating_value(self, rating: str) -> Optional[float]:
+        """Numeric value of an extracted rating such as '4.5/5'"""
+        rating_match = re.search(r'(\d+(?:\.\d+)?)', rating or '')
+        return float(rating_match.group(1)) if rating_match else None
+    
     def _detect_region_from_domain(self, domain: str) -> str:
         """Detect region from domain"""
-        # Try direct domain match
-        for domain_key, region in self.domain_region_mapping.items():
-            if domain_key in domain:
-                return region
-        
-        # TLD-based detection
-        tld_mapping = {
-            '.uk': 'uk-en', '.de': 'de-de', '.fr': 'fr-fr', '.it': 'it-it', '.es': 'es-es',
-            '.jp': 'jp-jp', '.in': 'in-en', '.au': 'au-en', '.ca': 'ca-en', '.br': 'br-pt',
-            '.mx': 'mx-es', '.ae': 'ae-en', '.sa': 'sa-ar', '.pk': 'pk-en', '.kr': 'kr-kr',
-            '.cn': 'cn-zh', '.sg': 'sg-en'
+        return self.region_index.lookup(domain, 'international')
+    
+    def _extract_fields(self, soup, base_url: str, known_fields: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+        """Extract name, price, image, availability, rating and description with the configured strategy.
+
+        known_fields, e.g. those sniffed from a streamed page, fill in what structured data lacks.
+        """
+        # Structured data first, CSS heuristics only for whatever it left out
+        fields = self._extract_structured_data(soup, base_url) if self.use_structured_data else {}
+        for field, value in (known_fields or {}).items():
+            fields.setdefault(field, value)
+        missing = [field for field in FIELD_SELECTORS if field not in fields]
+        if not missing:
+            return fields
+        
+        if self.extraction_strategy == 'single_pass':
+            fields.update(self._extract_fields_single_pass(soup, base_url, missing))
+            return fields
+        
+        extractors = {
+            'name': lambda: self._extract_product_name(soup),
+            'price': lambda: self._extract_product_price(soup),
+            'image_url': lambda: self._extract_image_url(soup, base_url),
+            'availability': lambda: self._extract_availability(soup),
+            'rating': lambda: self._extract_rating(soup),
+            'description': lambda: self._extract_description(soup)
         }
+        for field in missing:
+            fields[field] = extractors[field]()
+        return fields
+    
+    def _extract_structured_data(self, soup, base_url: str) -> Dict[str, str]:
+        """Read product fields from JSON-LD, OpenGraph and microdata markup"""
+        fields = {}
         
-        for tld, region in tld_mapping.items():
-            if domain.endswith(tld):
-                return region
+        # JSON-LD Product blocks
+        for script in soup.select('script[type="application/ld+json"]'):
+            try:
+                data = json.loads(script.get_text())
+            except ValueError:
+                continue
+            product = self._find_json_ld_product(data)
+            if product:
+                self._read_json_ld_product(product, base_url, fields)
+                break
         
-        return 'us-en' if domain.endswith('.com') else 'international'
+        # OpenGraph / product meta tags
+        meta = {}
+        for tag in soup.select('meta[property]'):
+            prop = (tag.get('property') or '').strip().lower()
+            if prop and prop not in meta and tag.get('content'):
+                meta[prop] = tag.get('content').strip()
+        
+        if 'name' not in fields and meta.get('og:title'):
+            fields['name'] = html_lib.unescape(meta['og:title'])
+        if 'image_url' not in fields and meta.get('og:image'):
+            fields['image_url'] = urljoin(base_url, meta['og:image'])
+        if 'description' not in fields and len(meta.get('og:description', '')) > 10:
+            fields['description'] = self._clean_description(html_lib.unescape(meta['og:description']))
+        if 'price' not in fields:
+            amount = meta.get('product:price:amount') or meta.get('og:price:amount')
+            currency = meta.get('product:price:currency') or meta.get('og:price:currency')
+            price = self._format_structured_price(amount, currency)
+            if price:
+                fields['price'] = price
+        if 'availability' not in fields:
+            availability = self._map_schema_availability(meta.get('product:availability') or meta.get('og:availability'))
+            if availability:
+                fields['availability'] = availability
+        
+        # Microdata offers carry machine-readable values in content attributes
+        if 'price' not in fields:
+            amount = soup.select_one('[itemprop="price"][content]')
+            currency = soup.select_one('[itemprop="priceCurrency"][content]')
+            if amount:
+                price = self._format_structured_price(amount.get('content'), currency.get('content') if currency else None)
+                if price:
+                    fields['price'] = price
+        
+        return fields
     
-    def _extract_product_name(self, soup: BeautifulSoup) -> str:
-        """Extract product name with enhanced selectors"""
-        selectors = [
-            'h1[id*="title"]', 'h1[class*="title"]', 'h1[class*="name"]',
-            '.product-title h1', '.product-name h1', '.item-title h1',
-            'h1', '.title', '.product-title', '.product-name',
-            '[data-testid="product-title"]', '[itemprop="name"]'
-        ]
+    def _find_json_ld_product(self, data) -> Optional[Dict]:
+        """Find the first schema.org Product node in a JSON-LD document"""
+        if isinstance(data, list):
+            for item in data:
+                product = self._find_json_ld_product(item)
+                if product:
+                    return product
+            return None
+        if not isinstance(data, dict):
+            return None
         
-        for selector in selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                name = elem.get_text().strip()
-                if 5 < len(name) < 200 and not re.match(r'^[\d\s\W]+$', name):
-                    return name
+        types = data.get('@type', [])
+        if isinstance(types, str):
+            types = [types]
+        if any(str(t).split('/')[-1] in ('Product', 'ProductGroup', 'IndividualProduct') for t in types):
+            return data
+        return self._find_json_ld_product(data.get('@graph', []))
+    
+    def _read_json_ld_product(self, product: Dict, base_url: str, fields: Dict[str, str]):
+        """Copy the fields a JSON-LD Product provides into fields"""
+        name = product.get('name')
+        if isinstance(name, str) and name.strip():
+            fields['name'] = html_lib.unescape(name.strip())
+        
+        image = product.get('image')
+        if isinstance(image, list):
+            image = image[0] if image else None
+        if isinstance(image, dict):
+            image = image.get('url') or image.get('contentUrl')
+        if isinstance(image, str) and image.strip():
+            fields['image_url'] = urljoin(base_url, image.strip())
+        
+        description = product.get('description')
+        if isinstance(description, str) and len(description.strip()) > 10:
+            fields['description'] = self._clean_description(html_lib.unescape(description.strip()))
+        
+        offers = product.get('offers')
+        if isinstance(offers, list):
+            offers = offers[0] if offers else None
+        if isinstance(offers, dict):
+            amount = offers.get('price', offers.get('lowPrice'))
+            if amount is None and isinstance(offers.get('priceSpecification'), dict):
+                amount = offers['priceSpecification'].get('price')
+            price = self._format_structured_price(amount, offers.get('priceCurrency'))
+            if price:
+                fields['price'] = price
+            availability = self._map_schema_availability(offers.get('availability'))
+            if availability:
+                fields['availability'] = availability
+        
+        rating = product.get('aggregateRating')
+        if isinstance(rating, dict):
+            try:
+                value = float(rating.get('ratingValue'))
+                best = float(rating.get('bestRating') or 5)
+                if best == 5:
+                    fields['rating'] = f"{str(rating['ratingValue']).strip()}/5"
+                elif best > 0:
+                    fields['rating'] = f"{round(value * 5 / best, 1):g}/5"
+            except (TypeError, ValueError):
+                pass
+    
+    def _format_structured_price(self, amount, currency: Optional[str]) -> Optional[str]:
+        """Format a machine-readable price like the text prices extract_price returns"""
+        if amount is None or isinstance(amount, bool):
+            return None
+        value = _parse_decimal(str(amount))
+        if value is None or not value.is_finite() or value <= 0:
+            return None
+        if value.as_tuple().exponent > 0:
+            value = value.quantize(Decimal(1))
+        
+        currency = (currency or '').strip().upper()
+        if currency in CURRENCY_SYMBOLS:
+            return f"{CURRENCY_SYMBOLS[currency]}{value:,}"
+        if currency:
+            return f"{currency} {value:,}"
+        return None
+    
+    def _map_schema_availability(self, value) -> Optional[str]:
+        if not isinstance(value, str):
+            return None
+        return SCHEMA_AVAILABILITY.get(value.rstrip('/').split('/')[-1].replace('_', '').lower())
+    
+    def _extract_fields_single_pass(self, soup, base_url: str, fields: Iterable[str] = tuple(FIELD_SELECTORS)) -> Dict[str, str]:
+        """Walk the document once, matching every field selector at each element.
+
+        Keeps the best candidate per field - lowest selector priority first, then
+        document order - exactly as the per-field extractors would pick it, and
+        stops as soon as every field holds a top-priority candidate.
+        """
+        candidate_extractors = {
+            'name': self._extract_name_candidate,
+            'price': self._extract_price_candidate,
+            'image_url': lambda elem: self._extract_image_candidate(elem, base_url),
+            'availability': self._extract_availability_candidate,
+            'rating': self._extract_rating_candidate,
+            'description': self._extract_description_candidate
+        }
+        wanted = set(fields)
+        best = {}
+        unresolved = set(wanted)
+        og_image_seen = False
+        
+        for elem, tag, attrs, ancestors in _iter_elements(soup):
+            keys = [('tag', tag), ('*',)]
+            for name in attrs:
+                keys.append(('attr', name))
+            element_id = _attr_value(attrs, 'id')
+            if element_id is not None:
+                keys.append(('id', element_id))
+            for cls in (_attr_value(attrs, 'class') or '').split():
+                keys.append(('class', cls))
+            
+            for key in keys:
+                for field, priority, selector in FIELD_SELECTOR_INDEX.get(key, ()):
+                    if field not in wanted or (field in best and best[field][0] <= priority):
+                        continue
+                    if not selector.matches(tag, attrs, ancestors):
+                        continue
+                    
+                    if priority == -1:
+                        # Only the first og:image meta tag is considered
+                        if og_image_seen:
+                            continue
+                        og_image_seen = True
+                        content = elem.get('content')
+                        value = urljoin(base_url, content) if content else None
+                    else:
+                        value = candidate_extractors[field](elem)
+                    
+                    if value is not None:
+                        best[field] = (priority, value)
+                        if priority == (-1 if field == 'image_url' else 0):
+                            unresolved.discard(field)
+            
+            if not unresolved:
+                break
         
-        return "Product name not found"
+        found = {field: value for field, (_, value) in best.items()}
+        for field in wanted:
+            if field in found:
+                continue
+            if field == 'price':
+                # Fallback to full page text
+                found['price'] = self.extract_price(soup.get_text())
+            else:
+                found[field] = FIELD_DEFAULTS[field]
+        return found
+    
+    def _extract_first_candidate(self, soup, field: str, candidate_extractor) -> Optional[str]:
+        """Return the first accepted candidate over a field's selectors in priority order"""
+        for selector in FIELD_SELECTORS[field]:
+            for elem in soup.select(selector):
+                value = candidate_extractor(elem)
+                if value is not None:
+                    return value
+        return None
+    
+    # Text candidates are whitespace-collapsed before any length check: the parser backends
+    # keep different whitespace-only text nodes, and the result must not depend on them
+    def _extract_name_candidate(self, elem) -> Optional[str]:
+        name = _WHITESPACE_RE.sub(' ', elem.get_text()).strip()
+        if 5 < len(name) < 200 and not re.match(r'^[\d\s\W]+$', name):
+            return name
+        return None
+    
+    def _extract_price_candidate(self, elem) -> Optional[str]:
+        extracted_price = self.extract_price(elem.get_text())
+        return extracted_price if extracted_price != "Price not found" else None
+    
+    def _extract_image_candidate(self, elem, base_url: str) -> Optional[str]:
+        src = elem.get('src') or elem.get('data-src')
+        if src and not src.startswith('data:'):
+            return urljoin(base_url, src)
+        return None
+    
+    def _extract_availability_candidate(self, elem) -> Optional[str]:
+        text = elem.get_text().lower()
+        if 'in stock' in text or 'available' in text:
+            return "In Stock"
+        elif 'out of stock' in text or 'unavailable' in text:
+            return "Out of Stock"
+        return None
+    
+    def _extract_rating_candidate(self, elem) -> Optional[str]:
+        text = elem.get_text() or elem.get('content', '')
+        rating_match = re.search(r'(\d+(?:\.\d+)?)', text)
+        return f"{rating_match.group(1)}/5" if rating_match else None
+    
+    def _extract_description_candidate(self, elem) -> Optional[str]:
+        desc = _WHITESPACE_RE.sub(' ', elem.get_text()).strip()
+        if 10 < len(desc) < 1000:
+            return self._clean_description(desc)
+        return None
+    
+    def _clean_description(self, desc: str) -> str:
+        """Collapse whitespace and cap a description at 300 characters"""
+        desc = re.sub(r'\s+', ' ', desc)
+        return desc[:300] + "..." if len(desc) > 300 else desc
+    
+    def _extract_product_name(self, soup: BeautifulSoup) -> str:
+        """Extract product name with enhanced selectors"""
+        name = self._extract_first_candidate(soup, 'name', self._extract_name_candidate)
+        return name if name is not None else FIELD_DEFAULTS['name']
     
     def _extract_product_price(self, soup: BeautifulSoup) -> str:
         """Extract price with enhanced selectors"""
-        price_selectors = [
-            '.a-price-whole', '.a-price', '.price-current', '.price-now',
-            '.product-price', '.current-price', '.sale-price', '.price',
-            '[data-testid="price"]', '.notranslate', '[class*="price"]',
-            '[itemprop="price"]', '.price-box', '.pricing'
-        ]
-        
-        for selector in price_selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                price_text = elem.get_text()
-                extracted_price = self.extract_price(price_text)
-                if extracted_price != "Price not found":
-                    return extracted_price
+        price = self._extract_first_candidate(soup, 'price', self._extract_price_candidate)
+        if price is not None:
+            return price
         
         # Fallback to full page text
         page_text = soup.get_text()
         return self.extract_price(page_text)
     
-    def extract_price(self, text: str) -> str:
-        """Enhanced price extraction"""
-        text = re.sub(r'\s+', ' ', text)
-        
-        patterns = [
-            r'\$\s*[\d,]+(?:\.\d{1,2})?',
-            r'€\s*[\d,]+(?:\.\d{1,2})?',
-            r'£\s*[\d,]+(?:\.\d{1,2})?',
-            r'₹\s*[\d,]+(?:\.\d{1,2})?',
-            r'PKR\s*[\d,]+(?:\.\d{1,2})?',
-            r'¥\s*[\d,]+',
-            r'AED\s*[\d,]+(?:\.\d{1,2})?',
-            r'SAR\s*[\d,]+(?:\.\d{1,2})?',
-            r'[\d,]+(?:\.\d{1,2})?\s*(?:USD|EUR|GBP|INR|PKR|JPY|AED|SAR)',
-            r'Rs\.?\s*[\d,]+(?:\.\d{1,2})?'
-        ]
+    def parse_price(self, text: str) -> Optional[PriceInfo]:
+        """Find the best price in a piece of text with a single scan.
+
+        Patterns are ranked as in PRICE_PATTERNS; among matches of the same
+        pattern the earliest wins.
+        """
+        best = None
+        for match in PRICE_SCANNER.finditer(text):
+            priority = match.lastindex - 1
+            if best is None or priority < best[0]:
+                best = (priority, match)
+                if priority == 0:
+                    break
         
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                return matches[0].strip()
+        if best is None:
+            return None
         
-        return "Price not found"
+        priority, match = best
+        raw = _WHITESPACE_RE.sub(' ', match.group(match.lastindex)).strip()
+        currency = PRICE_PATTERNS[priority][1]
+        if currency is None and priority == 8:
+            currency = raw[-3:].upper()
+        return PriceInfo(self._parse_price_amount(raw), currency, raw)
+    
+    def _parse_product_price(self, price: str) -> Optional[PriceInfo]:
+        """Parse an extracted price, including structured-data ones such as "CAD 1,299.99" """
+        price_info = self.parse_price(price)
+        if price_info is None:
+            match = _STRUCTURED_PRICE_RE.fullmatch(price)
+            if match:
+                price_info = PriceInfo(self._parse_price_amount(match.group(2)), match.group(1), price)
+        return price_info
+    
+    def _parse_price_amount(self, text: str) -> Optional[Decimal]:
+        number = _PRICE_NUMBER_RE.search(text)
+        return _parse_decimal(number.group()) if number else None
     
-    def _extract_location(self, url: str, soup: BeautifulSoup) -> str:
+    def extract_price(self, text: str) -> str:
+        """Enhanced price extraction"""
+        price_info = self.parse_price(text)
+        return price_info.raw if price_info else "Price not found"
+    
+    def _extract_location(self, url: str, soup: Optional[BeautifulSoup] = None) -> str:
         """Extract location with enhanced detection"""
-        domain = urlparse(url).netloc.lower()
-        
-        # Domain-based location mapping
-        domain_locations = {
-            'amazon.com': 'United States', 'amazon.co.uk': 'United Kingdom',
-            'amazon.de': 'Germany', 'amazon.fr': 'France', 'amazon.in': 'India',
-            'flipkart.com': 'India', 'pakwheels.com': 'Pakistan', 'daraz.pk': 'Pakistan',
-            'noon.com': 'United Arab Emirates', 'walmart.com': 'United States',
-            'ebay.com': 'United States', 'ebay.co.uk': 'United Kingdom'
-        }
-        
-        for domain_key, location in domain_locations.items():
-            if domain_key in domain:
-                return location
-        
-        # TLD-based detection
-        tld_mapping = {
-            '.uk': 'United Kingdom', '.de': 'Germany', '.fr': 'France',
-            '.in': 'India', '.pk': 'Pakistan', '.ae': 'United Arab Emirates',
-            '.jp': 'Japan', '.au': 'Australia', '.ca': 'Canada'
-        }
-        
-        for tld, location in tld_mapping.items():
-            if domain.endswith(tld):
-                return location
-        
-        return "International"
+        return self.location_index.lookup(urlparse(url).netloc, "International")
     
     def _extract_image_url(self, soup: BeautifulSoup, base_url: str) -> str:
         """Extract product image URL"""
-        img_selectors = [
-            '#landingImage', '#imgBlkFront', '.product-image img',
-            '.main-image img', 'meta[property="og:image"]',
-            'img[itemprop="image"]', '.gallery-image img'
-        ]
-        
         # Check meta tags first
-        meta = soup.select_one('meta[property="og:image"]')
+        meta = soup.select_one(OG_IMAGE_SELECTOR)
         if meta and meta.get('content'):
             return urljoin(base_url, meta.get('content'))
         
         # Check image tags
-        for selector in img_selectors:
-            imgs = soup.select(selector)
-            for img in imgs:
-                src = img.get('src') or img.get('data-src')
-                if src and not src.startswith('data:'):
-                    return urljoin(base_url, src)
+        image_url = self._extract_first_candidate(soup, 'image_url', lambda img: self._extract_image_candidate(img, base_url))
+        return image_url if image_url is not None else FIELD_DEFAULTS['image_url']
+    
+    def prefetch_image(self, image_url: str) -> concurrent.futures.Future:
+        """Start fetching an image on the image pool, or return the fetch already under way"""
+        core = self.core
+        # Scrapers sharing the core may transcode differently, so their fetches are kept apart
+        key = (image_url, tuple(self.max_image_size), self.image_quality)
+        with core.image_lock:
+            future = core.image_futures.get(key)
+            if future is None:
+                future = core.image_executor.submit(self._fetch_and_process_image, image_url)
+                core.image_futures[key] = future
+                while len(core.image_futures) > core.image_cache_size:
+                    core.image_futures.popitem(last=False)
+            else:
+                core.image_futures.move_to_end(key)
+        return future
+    
+    def prefetch_images(self, products: Iterable[Dict]):
+        """Queue image fetches for products about to be displayed"""
+        for product in products:
+            if product.get('image_url') and not product.get('image_key'):
+                self.prefetch_image(product['image_url'])
+    
+    def get_image_key(self, product: Dict, timeout: float = None) -> Optional[str]:
+        """Image store key of a product's thumbnail, fetched on first use. The product is left unchanged"""
+        if product.get('image_key'):
+            return product['image_key']
+        if not product.get('image_url'):
+            return None
         
-        return ""
+        try:
+            # Fetches already started or finished are found in the core's image futures
+            return self.prefetch_image(product['image_url']).result(timeout=timeout or self.image_fetch_timeout * 2)
+        except Exception as e:
+            logger.warning(f"Error fetching image {product['image_url']}: {e}")
+            return None
     
-    def _fetch_and_process_image(self, image_url: str) -> Optional[bytes]:
-        """Fetch and process image data with timeout"""
+    def get_image(self, product: Dict, timeout: float = None) -> Optional[bytes]:
+        """Thumbnail bytes for a product"""
+        image_key = self.get_image_key(product, timeout)
+        return self.image_store.get(image_key) if image_key else None
+    
+    def get_image_path(self, product: Dict, timeout: float = None) -> Optional[str]:
+        """Local file holding a product's thumbnail, for UIs that serve images from disk"""
+        image_key = self.get_image_key(product, timeout)
+        if image_key and image_key in self.image_store:
+            return self.image_store.path_for(image_key)
+        return None
+    
+    def _fetch_and_process_image(self, image_url: str) -> Optional[str]:
+        """Fetch an image, shrink it and keep it in the image store. Returns its key"""
         try:
-            response = self.session.get(image_url, timeout=self.image_fetch_timeout, stream=True)
-            response.raise_for_status()
-            
-            # Process image
-            img = Image.open(BytesIO(response.content))
-            if img.width > self.max_image_size[0] or img.height > self.max_image_size[1]:
-                img.thumbnail(self.max_image_size, Image.LANCZOS)
-            
-            if img.mode != 'RGB':
-                img = img.convert('RGB')
-            
-            output = BytesIO()
-            img.save(output, format='JPEG', quality=self.image_quality, optimize=True)
-            return output.getvalue()
+            response = self._fetch(image_url, self.image_fetch_timeout, binary=True)
+            return self._store_image(response.content)
             
         except Exception as e:
             logger.warning(f"Error fetching image {image_url}: {e}")
             return None
     
+    def _store_image(self, content: bytes) -> str:
+        return self.image_store.put(self._process_image_bytes(content))
+    
+    def _process_image_bytes(self, content: bytes) -> bytes:
+        """Resize and re-encode raw image bytes as JPEG, on the transcoding process pool when available"""
+        pool = self.core.get_transcode_pool()
+        if pool is not None:
+            try:
+                future = pool.submit(transcode_image, content, self.max_image_size, self.image_quality)
+            except (RuntimeError, OSError) as e:  # Includes BrokenProcessPool
+                self.core.disable_transcode_pool(e)
+            else:
+                try:
+                    return future.result()
+                except BrokenProcessPool as e:
+                    # A worker died; errors decoding this particular image still raise as usual
+                    self.core.disable_transcode_pool(e)
+        
+        return transcode_image(content, self.max_image_size, self.image_quality)
+    
     def _extract_availability(self, soup: BeautifulSoup) -> str:
         """Extract availability status"""
-        availability_selectors = [
-            '#availability', '.availability', '.stock', '[id*="stock"]'
-        ]
-        
-        for selector in availability_selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                text = elem.get_text().lower()
-                if 'in stock' in text or 'available' in text:
-                    return "In Stock"
-                elif 'out of stock' in text or 'unavailable' in text:
-                    return "Out of Stock"
-        
-        return "Unknown"
+        availability = self._extract_first_candidate(soup, 'availability', self._extract_availability_candidate)
+        return availability if availability is not None else FIELD_DEFAULTS['availability']
     
     def _extract_rating(self, soup: BeautifulSoup) -> str:
         """Extract product rating"""
-        rating_selectors = [
-            '.a-icon-alt', '.rating', '.stars', '[itemprop="ratingValue"]'
-        ]
-        
-        for selector in rating_selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                text = elem.get_text() or elem.get('content', '')
-                rating_match = re.search(r'(\d+(?:\.\d+)?)', text)
-                if rating_match:
-                    return f"{rating_match.group(1)}/5"
-        
-        return "No rating"
+        rating = self._extract_first_candidate(soup, 'rating', self._extract_rating_candidate)
+        return rating if rating is not None else FIELD_DEFAULTS['rating']
     
     def _extract_description(self, soup: BeautifulSoup) -> str:
         """Extract product description"""
-        desc_selectors = [
-            '#productDescription', '.product-description', '.description',
-            '[itemprop="description"]', '.product-details'
-        ]
-        
-        for selector in desc_selectors:
-            elems = soup.select(selector)
-            for elem in elems:
-                desc = elem.get_text().strip()
-                if 10 < len(desc) < 1000:
-                    desc = re.sub(r'\s+', ' ', desc)
-                    return desc[:300] + "..." if len(desc) > 300 else desc
-        
-        return "No description available"
+        description = self._extract_first_candidate(soup, 'description', self._extract_description_candidate)
+        return description if description is not None else FIELD_DEFAULTS['description']
     
     def search_and_scrape_enhanced(self, query: str, category: str = 'general', max_results: int = 100,
-                                  regions: List[str] = None, progress_callback=None) -> List[Dict]:
+                                  regions: List[str] = None, progress_callback=None) -> List[Product]:
         """Main enhanced search and scrape function with aggressive result targeting"""
         logger.info(f"Starting aggressive search for: '{query}' with target: {max_results} results")
         
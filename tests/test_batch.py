@@ -0,0 +1,106 @@
+"""Multi-query batches: one shared scrape per URL, per-query completion and CLI resume."""
+import json
+
+import pytest
+
+import cli
+from scraper import ProductScraper, ScraperCore
+
+# Search results per query, as paths on the local site; several queries share pages
+SEARCHES = {
+    'kettle': ['/a', '/b', '/c'],
+    'steel kettle': ['/b', '/c?utm_source=ads', '/d'],
+    'tea': ['/a', '/e'],
+}
+PATHS = ('/a', '/b', '/c', '/d', '/e')
+
+
+@pytest.fixture
+def shop(site, monkeypatch):
+    """Product pages on the local site, and a search that returns SEARCHES for each query"""
+    for path in PATHS:
+        html = f'<html><body><h1 class="product-title">Product {path[1:]} kettle</h1><span class="price">$1{len(path)}.99</span></body></html>'
+        site.pages[path] = (200, {'Content-Type': 'text/html; charset=utf-8'}, html.encode())
+    site.pages['/c?utm_source=ads'] = site.pages['/c']
+    searched = []
+
+    def iter_search_results(self, query, category='general', max_results=100, progress_callback=None):
+        searched.append(query)
+        for path in SEARCHES[query][:max_results]:
+            yield {'url': site.url(path), 'title': f"{query} result", 'snippet': '', 'source': 'stub'}
+    monkeypatch.setattr(ProductScraper, 'iter_search_results', iter_search_results)
+    return searched
+
+
+def page(product) -> str:
+    return product['product_url'].split('?')[0].rsplit('/', 1)[1]
+
+
+def make_core(monkeypatch):
+    core = ScraperCore(None, refresh_domain_catalog=False)
+    # Leave deduplication to the batch scheduler alone
+    monkeypatch.setattr(core.url_cache, 'get', lambda url: None)
+    return core
+
+
+def test_each_url_is_scraped_once_and_delivered_per_query(site, shop, monkeypatch):
+    scraper = ProductScraper(core=make_core(monkeypatch))
+    scraper.batch_search_concurrency = 3
+    events = []
+
+    for query, product in scraper.iter_batch_search_and_scrape(SEARCHES, max_workers=4,
+                                                                query_callback=lambda query: events.append((query, None))):
+        events.append((query, product))
+
+    assert sorted(shop) == sorted(SEARCHES)
+    # /c and /c?utm_source=ads are the same page; whichever came first was scraped
+    site.requests = [(path.split('?')[0], headers) for path, headers in site.requests]
+    assert {path: site.hits(path) for path in PATHS} == dict.fromkeys(PATHS, 1)
+
+    delivered = {query: {page(product) for q, product in events if q == query and product}
+                 for query in SEARCHES}
+    assert delivered == {'kettle': {'a', 'b', 'c'}, 'steel kettle': {'b', 'c', 'd'}, 'tea': {'a', 'e'}}
+    for query, product in events:
+        if product:
+            assert product['search_title'] == f"{query} result"
+
+    # query_callback comes once per query, after all of that query's products
+    done = [query for query, product in events if product is None]
+    assert sorted(done) == sorted(SEARCHES)
+    for query in SEARCHES:
+        assert max(i for i, (q, product) in enumerate(events) if q == query and product) < events.index((query, None))
+
+
+def test_cli_resumes_after_interrupt(tmp_path, site, shop, monkeypatch):
+    monkeypatch.setattr(cli, 'get_shared_core', lambda cache_dir: make_core(monkeypatch))
+    monkeypatch.setattr(cli.signal, 'signal', lambda signum, handler: None)
+    checkpoint = cli.Checkpoint
+    queries = tmp_path / 'queries.txt'
+    queries.write_text('\n'.join(SEARCHES) + '\n# comment\nkettle\n', encoding='utf-8')
+    output = tmp_path / 'products.jsonl'
+    argv = [str(queries), '-o', str(output), '--no-cache', '--concurrency', '1', '--workers', '2', '-q']
+
+    class InterruptedCheckpoint(cli.Checkpoint):
+        def mark_done(self, query):
+            super().mark_done(query)
+            raise KeyboardInterrupt  # Stop as Ctrl+C would, right after the first query finishes
+
+    monkeypatch.setattr(cli, 'Checkpoint', InterruptedCheckpoint)
+    assert cli.main(argv) == 130
+    with open(f"{output}.checkpoint.json", encoding='utf-8') as f:
+        finished = set(json.load(f)['completed'])
+    assert len(finished) == 1
+
+    monkeypatch.setattr(cli, 'Checkpoint', checkpoint)
+    shop.clear()
+    assert cli.main(argv) == 0
+
+    # The resumed run only searched what was left, and the output holds each product once per query
+    assert sorted(shop) == sorted(set(SEARCHES) - finished)
+    with open(output, encoding='utf-8') as f:
+        records = [json.loads(line) for line in f]
+    pairs = [(record['query'], page(record)) for record in records]
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == {(query, path.split('?')[0][1:]) for query, paths in SEARCHES.items() for path in paths}
+    assert cli.main(argv) == 0
+    assert sorted(shop) == sorted(set(SEARCHES) - finished)
@@ -0,0 +1,73 @@
+"""The single-pass extractor must produce exactly what the per-field extractors do.
+
+Documents are generated from a fixed seed out of the class names, ids and texts the
+field selectors and candidate checks look for, nested at random, so they hit
+selector priority, document order and candidate rejection on every backend.
+"""
+import random
+
+import pytest
+
+from scraper import FIELD_SELECTORS, LXML_AVAILABLE, PARSER_BACKENDS, ProductScraper, ScraperCore
+
+CLASSES = ('title', 'product-title', 'product-name', 'item-title', 'a-price-whole', 'a-price', 'price', 'sale-price',
+           'notranslate', 'price-box', 'pricing', 'product-image', 'main-image', 'gallery-image', 'availability',
+           'stock', 'a-icon-alt', 'rating', 'stars', 'description', 'product-details', 'subtitle', 'x')
+IDS = ('title', 'productTitle', 'landingImage', 'imgBlkFront', 'availability', 'outOfStock', 'productDescription',
+       'instock', 'z')
+TEXTS = ('$12.99', 'Rs. 4,000', 'In stock', 'Out of Stock', 'unavailable', '4.5 out of 5', 'Great Product Name Here',
+         '  ', '12', 'A long description of this thing that goes on.', '€ 5', 'nothing', '¥ 3,000', '1,299 USD',
+         'x' * 1200, 'Available now')
+TAGS = ('div', 'span', 'img', 'b', 'section', 'h1')
+DOCUMENTS = 300
+
+
+def random_markup(rng: random.Random, depth: int = 0) -> str:
+    out = []
+    for _ in range(rng.randint(0, 4 if depth < 4 else 0)):
+        tag = rng.choice(TAGS)
+        attrs = []
+        if rng.random() < 0.5:
+            attrs.append(f'class="{" ".join(rng.sample(CLASSES, rng.randint(1, 3)))}"')
+        if rng.random() < 0.25:
+            attrs.append(f'id="{rng.choice(IDS)}"')
+        if tag == 'img' or rng.random() < 0.1:
+            attrs.append(f'{rng.choice(("src", "data-src"))}="{rng.choice(("a.jpg", "data:x", "/b.png", ""))}"')
+        if rng.random() < 0.1:
+            attrs.append(f'itemprop="{rng.choice(("name", "price", "ratingValue", "description", "image"))}"')
+        if rng.random() < 0.1:
+            attrs.append(f'data-testid="{rng.choice(("price", "product-title"))}"')
+        if rng.random() < 0.1:
+            attrs.append(f'content="{rng.choice(("4.1", "x"))}"')
+        attributes = ' ' + ' '.join(attrs) if attrs else ''
+        if tag == 'img':
+            out.append(f'<img{attributes}>')
+            continue
+        text = rng.choice(TEXTS) if rng.random() < 0.6 else ''
+        tail = rng.choice(('', ' ', rng.choice(TEXTS)))
+        out.append(f'<{tag}{attributes}>{text}{random_markup(rng, depth + 1)}</{tag}>{tail}')
+    return ''.join(out)
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return ProductScraper(core=ScraperCore(None, refresh_domain_catalog=False))
+
+
+@pytest.mark.parametrize('use_structured_data', (True, False))
+@pytest.mark.parametrize('backend', PARSER_BACKENDS)
+def test_single_pass_matches_per_field(scraper, backend, use_structured_data):
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        pytest.skip('lxml is not installed')
+    scraper.parser_backend = backend
+    scraper.use_structured_data = use_structured_data
+    rng = random.Random(20240601)
+
+    for _ in range(DOCUMENTS):
+        html = f'<html><head></head><body>{random_markup(rng)}</body></html>'
+        fields = {}
+        for strategy in ('per_field', 'single_pass'):
+            scraper.extraction_strategy = strategy
+            fields[strategy] = scraper._extract_fields(scraper._make_soup(html), 'https://www.shop.example.com/item/')
+        assert fields['single_pass'] == fields['per_field'], html
+        assert set(fields['single_pass']) == set(FIELD_SELECTORS)
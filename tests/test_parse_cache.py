@@ -0,0 +1,38 @@
+"""Parse cache invalidation by the extractor fingerprint."""
+import inspect
+
+import pytest
+
+import scraper
+from scraper import ParseCache, Product, ProductScraper, extractor_fingerprint
+
+SOURCE = inspect.getsource(scraper)
+
+# Helpers and tables outside the _extract_* methods that still shape the extracted fields
+EDITS = {
+    'availability table': ('\'preorder\': "Pre-order"', '\'preorder\': "In Stock"'),
+    'currency table': ("'GBP': '£'", "'GBP': 'GBP '"),
+    'price helper': ("if value is None or not value.is_finite() or value <= 0:", "if value is None or value <= 0:"),
+    'parser wrapper': ("class LxmlTag:", "class LxmlTag(object):"),
+}
+
+
+def test_version_is_the_fingerprint_of_the_module_source():
+    assert ProductScraper.extractor_version() == extractor_fingerprint(SOURCE)
+
+
+@pytest.mark.parametrize('edit', EDITS)
+def test_editing_extraction_code_changes_the_version(edit):
+    old, new = EDITS[edit]
+    assert SOURCE.count(old) == 1
+    assert extractor_fingerprint(SOURCE.replace(old, new)) != extractor_fingerprint(SOURCE)
+
+
+def test_entries_from_another_version_are_purged(tmp_path):
+    path = str(tmp_path / 'parsed.sqlite')
+    product = Product(name='Kettle', price='€12.50', product_url='https://shop.example.com/kettle')
+    ParseCache(path, 'old').store(product.product_url, 'body', product)
+
+    assert ParseCache(path, 'old').get(product.product_url, 'body')['price'] == '€12.50'
+    assert ParseCache(path, 'new').get(product.product_url, 'body') is None
+    assert ParseCache(path, 'old').get(product.product_url, 'body') is None
@@ -0,0 +1,110 @@
+"""The lxml and html.parser backends must extract the same fields.
+
+Covers hand-written product pages, random well-formed documents and random
+documents with the markup errors both backends repair alike. Elements left open
+where HTML implies their end tag are the known exception, see _make_soup.
+"""
+import random
+import re
+
+import pytest
+
+from scraper import LXML_AVAILABLE, ProductScraper, ScraperCore
+from test_extraction import random_markup
+
+pytestmark = pytest.mark.skipif(not LXML_AVAILABLE, reason='lxml is not installed')
+
+BASE_URL = 'https://www.shop.example.com/item/'
+PAGES = {
+    'json-ld': """<!DOCTYPE html><html><head>
+        <script type="application/ld+json">{"@type": "Product", "name": "Trail Runner 2 &amp; Co",
+          "image": "/img/shoe.jpg", "description": "Light shoe for long runs on rough ground.",
+          "offers": {"price": "89,90", "priceCurrency": "EUR", "availability": "https://schema.org/InStock"},
+          "aggregateRating": {"ratingValue": "4.4", "bestRating": "5"}}</script>
+        </head><body><h1 class="product-title">Trail Runner 2</h1></body></html>""",
+    'opengraph': """<html><head>
+        <meta property="og:title" content="  Ceramic Pour-Over Set ">
+        <meta property="og:image" content="https://cdn.example.com/pour.jpg">
+        <meta property="product:price:amount" content="34.00">
+        <meta property="product:price:currency" content="USD">
+        </head><body><div class="description">
+            Hand-glazed dripper
+            with two cups.
+        </div></body></html>""",
+    'layout whitespace': """<html><body>
+        <div id="centerCol">
+          <h1 id="title">
+            <span id="productTitle">
+                Noise Cancelling   Headphones,
+                Wireless
+            </span>
+          </h1>
+          <div class="a-price"> <span class="a-price-whole">1,299</span> <span>USD</span> </div>
+          <div id="availability">
+            <span> In stock </span>
+          </div>
+          <span class="a-icon-alt">4.6 out of 5 stars</span>
+          <img id="landingImage" data-src="/images/hp.jpg" src="data:image/gif;base64,R0lGOD">
+        </div></body></html>""",
+    'stray closers': """<html><body></div><div class="product-name">Walnut Desk Organizer</span></div>
+        </b><span class="price">£24.50</span></section><div class="stock">Out of Stock</div></p></body></html>""",
+    'unclosed inline': """<html><body><div class="product"><span class="product-title">Steel Water Bottle
+        <b>1L</div><div class="price">Rs. 4,000</div><div class="rating">4.1</div>
+        <div class="description">Keeps drinks cold for a whole day at the beach.</div></body></html>""",
+    'sloppy markup': """<HTML><BODY><DIV CLASS=product-title>Linen Bed Sheet&nbsp;Set<!-- queen --></DIV>
+        <img class=product-image src=/sheets.jpg alt=sheets><br>
+        <SPAN class="price">¥ 3,000</SPAN><div class=availability>Available now<br>Ships in 2 days
+        <script>var html = "</div><div class='price'>$1</div>";</script>
+        <div class="description">Stonewashed linen, soft from the first night.</div>""",
+}
+MALFORMATIONS = {
+    'stray closers': lambda html, rng: re.sub(r'(<(?:div|span|b|section)[^>]*>)',
+                                              lambda m: m.group(1) + ('</div>' if rng.random() < 0.2 else ''), html),
+    'unclosed inline': lambda html, rng: re.sub(r'</(?:span|b)>', lambda m: '' if rng.random() < 0.5 else m.group(0), html),
+    'uppercase unquoted': lambda html, rng: re.sub(r'<(div|span|b)\b', lambda m: f'<{m.group(1).upper()}', html)
+                                            .replace('class="x"', 'class=x'),
+    'no closing body': lambda html, rng: html,
+}
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return ProductScraper(core=ScraperCore(None, refresh_domain_catalog=False))
+
+
+def extract(scraper, backend, html):
+    scraper.parser_backend = backend
+    return scraper._extract_fields(scraper._make_soup(html), BASE_URL)
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_product_pages(scraper, page):
+    assert extract(scraper, 'lxml', PAGES[page]) == extract(scraper, 'html.parser', PAGES[page])
+
+
+def test_layout_whitespace_is_collapsed(scraper):
+    fields = extract(scraper, 'lxml', PAGES['layout whitespace'])
+    assert fields['name'] == 'Noise Cancelling Headphones, Wireless'
+
+
+@pytest.mark.parametrize('malformation', (None, *MALFORMATIONS))
+def test_random_documents(scraper, malformation):
+    rng = random.Random(20240615)
+    for _ in range(300):
+        markup = random_markup(rng)
+        if malformation:
+            markup = MALFORMATIONS[malformation](markup, rng)
+        html = f'<html><head></head><body>{markup}' + ('' if malformation == 'no closing body' else '</body></html>')
+        assert extract(scraper, 'lxml', html) == extract(scraper, 'html.parser', html), html
+
+
+@pytest.mark.parametrize('markup', (
+    '<ul><li class="title">Great Product Name<li class="price">$12.99</ul>',
+    '<p class="title">Great Product Name<p class="price">$12.99',
+    '<table><tr><td class="title">Great Product Name<td class="price">$12.99</table>',
+))
+def test_implied_end_tags_are_a_known_divergence(scraper, markup):
+    html = f'<html><body>{markup}</body></html>'
+    # lxml closes the element like a browser; html.parser keeps it open around its siblings
+    assert extract(scraper, 'lxml', html)['name'] == 'Great Product Name'
+    assert extract(scraper, 'html.parser', html)['name'] == 'Great Product Name$12.99'
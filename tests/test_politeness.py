@@ -0,0 +1,119 @@
+"""Per-host rate and concurrency limits of PolitenessScheduler."""
+import threading
+import time
+from collections import Counter
+
+import pytest
+
+from scraper import PolitenessScheduler
+
+
+class Clock:
+    """Fake monotonic clock; sleeping advances it"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'monotonic', clock)
+    monkeypatch.setattr(time, 'sleep', clock.sleep)
+    return clock
+
+
+def test_rate_is_limited_per_host(clock):
+    politeness = PolitenessScheduler(default_rate=1.0, default_burst=2, default_concurrency=10)
+    politeness.set_domain_limit('fast.example.com', rate=10.0, burst=1)
+    start = clock.now
+
+    def request(url):
+        politeness.release(politeness.acquire(url))
+        return round(clock.now - start, 3)
+
+    # The burst goes out at once, then one request per 1/rate seconds
+    assert [request('https://slow.example.com/p') for _ in range(4)] == [0, 0, 1, 2]
+    # The slow host's waits refilled the fast host's bucket, but not past its burst of one
+    assert [request('https://www.fast.example.com/p') for _ in range(3)] == [2, 2.1, 2.2]
+    assert request('https://slow.example.com/p') == 3
+
+
+def test_concurrency_is_capped_per_host():
+    politeness = PolitenessScheduler(default_rate=1000.0, default_burst=1000, default_concurrency=2)
+    politeness.set_domain_limit('b.example.com', concurrency=3)
+    politeness.poll_interval = 0.005
+    lock = threading.Lock()
+    in_flight, peak = Counter(), Counter()
+
+    def request(host):
+        with politeness.slot(f"https://{host}/p"):
+            with lock:
+                in_flight[host] += 1
+                peak[host] = max(peak[host], in_flight[host])
+            time.sleep(0.02)
+            with lock:
+                in_flight[host] -= 1
+
+    threads = [threading.Thread(target=request, args=(host,))
+               for host in ('a.example.com', 'b.example.com') for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert peak == {'a.example.com': 2, 'b.example.com': 3}
+
+
+def test_limits_match_by_domain_suffix():
+    politeness = PolitenessScheduler(default_rate=2.0, default_burst=4, default_concurrency=4)
+    politeness.set_domain_limit('.Amazon.com', rate=1.0)
+    politeness.set_domain_limit('smile.amazon.com', concurrency=1)
+
+    assert politeness.limits_for('amazon.com')['rate'] == 1.0
+    assert politeness.limits_for('www.amazon.com:443')['rate'] == 1.0
+    assert politeness.limits_for('smile.amazon.com') == {'rate': 2.0, 'burst': 4, 'concurrency': 1}
+    assert politeness.limits_for('notamazon.com') == politeness.default_limits
+    assert politeness.limits_for('amazon.com.evil.example') == politeness.default_limits
+
+
+def test_changing_limits_keeps_requests_in_flight(clock):
+    politeness = PolitenessScheduler(default_rate=10.0, default_burst=10, default_concurrency=2)
+    first = politeness.acquire('https://shop.example.com/1')
+    politeness.acquire('https://shop.example.com/2')
+
+    politeness.set_domain_limit('shop.example.com', rate=10.0, burst=2, concurrency=3)
+    politeness.acquire('https://shop.example.com/3')
+    # Three in flight now, the fourth waits for a release
+    assert politeness._try_acquire(first) == politeness.poll_interval
+    politeness.release(first)
+    clock.sleep(0.1)
+    assert politeness._try_acquire(first) == 0
+
+
+def test_idle_hosts_are_forgotten(clock):
+    politeness = PolitenessScheduler(default_rate=1.0, default_burst=2, default_concurrency=4)
+    politeness.idle_sweep_interval = 10
+    politeness.set_domain_limit('drained.example.com', rate=0.01)
+    politeness.release(politeness.acquire('https://idle.example.com/p'))
+    busy = politeness.acquire('https://busy.example.com/p')
+    for _ in range(2):
+        politeness.release(politeness.acquire('https://drained.example.com/p'))
+
+    # The next request sweeps: idle has refilled its bucket, drained has not and busy is in flight
+    clock.sleep(11)
+    politeness.release(politeness.acquire('https://other.example.com/p'))
+    assert set(politeness._hosts) == {'busy.example.com', 'drained.example.com', 'other.example.com'}
+
+    # A forgotten host starts over with a full bucket
+    start = clock.now
+    for _ in range(2):
+        politeness.release(politeness.acquire('https://idle.example.com/p'))
+    assert clock.now == start
+    politeness.release(busy)
@@ -0,0 +1,101 @@
+"""Price parsing: the single-scan extract_price against the original pattern loop, and PriceInfo values."""
+import random
+import re
+from decimal import Decimal
+
+import pytest
+
+from scraper import ProductScraper, ScraperCore
+
+STRINGS = 20000
+
+# extract_price before PRICE_SCANNER: one search per pattern, in priority order
+BASELINE_PATTERNS = [
+    r'\$\s*[\d,]+(?:\.\d{1,2})?',
+    r'€\s*[\d,]+(?:\.\d{1,2})?',
+    r'£\s*[\d,]+(?:\.\d{1,2})?',
+    r'₹\s*[\d,]+(?:\.\d{1,2})?',
+    r'PKR\s*[\d,]+(?:\.\d{1,2})?',
+    r'¥\s*[\d,]+',
+    r'AED\s*[\d,]+(?:\.\d{1,2})?',
+    r'SAR\s*[\d,]+(?:\.\d{1,2})?',
+    r'[\d,]+(?:\.\d{1,2})?\s*(?:USD|EUR|GBP|INR|PKR|JPY|AED|SAR)',
+    r'Rs\.?\s*[\d,]+(?:\.\d{1,2})?'
+]
+
+
+def baseline_extract_price(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text)
+    for pattern in BASELINE_PATTERNS:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        if matches:
+            return matches[0].strip()
+    return "Price not found"
+
+
+TOKENS = ('$', '€', '£', '₹', '¥', 'PKR', 'pkr', 'AED', 'SAR', 'sar', 'Rs', 'rs.', 'RS.', 'USD', 'usd', 'EUR', 'GBP',
+          'INR', 'JPY', 'Price:', 'was', 'now', '1', '12', '1,299', '4,000', '.', '.5', '.99', '.999', ',', ',50',
+          '0', ' ', '  ', '\n', '\t', '\xa0', 'x', 'abc', '-', '%')
+
+
+@pytest.fixture(scope='module')
+def scraper():
+    return ProductScraper(core=ScraperCore(None, refresh_domain_catalog=False))
+
+
+def test_extract_price_matches_the_pattern_loop(scraper):
+    rng = random.Random(20240610)
+    for _ in range(STRINGS):
+        text = ''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 12)))
+        assert scraper.extract_price(text) == baseline_extract_price(text), repr(text)
+
+
+@pytest.mark.parametrize('text, amount, currency, raw', (
+    ('Now only $1,299.99!', '1299.99', 'USD', '$1,299.99'),
+    ('€ 5', '5', 'EUR', '€ 5'),
+    ('£24.5 and £3', '24.5', 'GBP', '£24.5'),
+    ('₹1,49,999', '149999', 'INR', '₹1,49,999'),
+    ('¥ 3,000', '3000', 'JPY', '¥ 3,000'),
+    ('pkr 1,500.50', '1500.50', 'PKR', 'pkr 1,500.50'),
+    ('AED\xa099', '99', 'AED', 'AED 99'),
+    ('1,299 usd', '1299', 'USD', '1,299 usd'),
+    ('Rs. 4,000', '4000', None, 'Rs. 4,000'),
+    ('Rs 4,000 or $50', '50', 'USD', '$50'),
+    # Comma as the decimal mark
+    ('€12,50', '12.50', 'EUR', '€12,50'),
+    ('12,5 EUR', '12.5', 'EUR', '12,5 EUR'),
+    ('£1,299,000', '1299000', 'GBP', '£1,299,000'),
+))
+def test_parse_price(scraper, text, amount, currency, raw):
+    price_info = scraper.parse_price(text)
+    assert (price_info.amount, price_info.currency, price_info.raw) == (Decimal(amount), currency, raw)
+    assert scraper.extract_price(text) == raw
+
+
+@pytest.mark.parametrize('text', ('', 'Free shipping', '5 stars', '$', 'USD'))
+def test_no_price(scraper, text):
+    assert scraper.parse_price(text) is None
+    assert scraper.extract_price(text) == "Price not found"
+
+
+@pytest.mark.parametrize('price, amount, currency', (
+    ('CAD 1,299.99', '1299.99', 'CAD'),
+    ('€12.50', '12.50', 'EUR'),
+    ('CHF 12,50', '12.50', 'CHF'),
+))
+def test_parse_product_price(scraper, price, amount, currency):
+    price_info = scraper._parse_product_price(price)
+    assert (price_info.amount, price_info.currency) == (Decimal(amount), currency)
+
+
+@pytest.mark.parametrize('amount, currency, price', (
+    ('12,50', 'EUR', '€12.50'),
+    ('1.299,50', 'EUR', '€1,299.50'),
+    ('1,299.50', 'usd', '$1,299.50'),
+    (1299, 'CAD', 'CAD 1,299'),
+    ('4 000', 'INR', '₹4,000'),
+    ('0', 'USD', None),
+    ('12.99', None, None),
+))
+def test_format_structured_price(scraper, amount, currency, price):
+    assert scraper._format_structured_price(amount, currency) == price
@@ -0,0 +1,167 @@
+"""HTTP response cache: freshness, conditional revalidation and eviction.
+
+Fetches go through both fetch engines to a local server; the clock is faked, so
+expiry needs no sleeping.
+"""
+import asyncio
+import time
+from email.utils import formatdate
+
+import pytest
+
+from scraper import AIOHTTP_AVAILABLE, FETCH_ENGINES, ProductScraper, ResponseCache, ScraperCore
+
+if AIOHTTP_AVAILABLE:
+    import aiohttp
+
+
+class Clock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=FETCH_ENGINES)
+def fetch(request, tmp_path, site, clock):
+    """Fetch a path from the local site through the response cache with the parametrized engine"""
+    if request.param == 'asyncio' and not AIOHTTP_AVAILABLE:
+        pytest.skip('aiohttp is not installed')
+    scraper = ProductScraper(core=ScraperCore(str(tmp_path), refresh_domain_catalog=False))
+
+    async def fetch_async(url):
+        async with aiohttp.ClientSession() as session:
+            return await scraper._fetch_async(session, asyncio.Semaphore(1), url, 5)
+
+    def fetch(path):
+        if request.param == 'asyncio':
+            return asyncio.run(fetch_async(site.url(path)))
+        return scraper._fetch(site.url(path), 5)
+    return fetch
+
+
+def validated_page(body: bytes, etag: str, headers: dict):
+    """Page that answers a matching If-None-Match with 304 and the same headers"""
+    def page(request_headers):
+        if request_headers.get('If-None-Match') == etag:
+            return 304, dict(headers, ETag=etag), b''
+        return 200, dict(headers, ETag=etag), body
+    return page
+
+
+def test_fresh_for_max_age_then_revalidated(site, fetch, clock):
+    site.pages['/p'] = validated_page(b'<p>v1</p>', '"v1"', {'Cache-Control': 'max-age=60'})
+
+    assert fetch('/p').content == b'<p>v1</p>'
+    clock.advance(59)
+    response = fetch('/p')
+    assert response.from_cache and response.content == b'<p>v1</p>'
+    assert site.hits('/p') == 1
+
+    # Stale: a conditional request, answered 304, makes the entry fresh again
+    clock.advance(2)
+    assert fetch('/p').content == b'<p>v1</p>'
+    assert site.hits('/p') == 2
+    assert site.requests[-1][1].get('If-None-Match') == '"v1"'
+    clock.advance(59)
+    fetch('/p')
+    assert site.hits('/p') == 2
+
+
+def test_changed_page_replaces_the_entry(site, fetch, clock):
+    site.pages['/p'] = validated_page(b'<p>v1</p>', '"v1"', {'Cache-Control': 'max-age=60'})
+    fetch('/p')
+    site.pages['/p'] = validated_page(b'<p>v2</p>', '"v2"', {'Cache-Control': 'max-age=60'})
+
+    clock.advance(61)
+    assert fetch('/p').content == b'<p>v2</p>'
+    assert fetch('/p').from_cache
+    assert site.hits('/p') == 2
+
+
+def test_no_store_is_never_cached(site, fetch):
+    site.pages['/p'] = (200, {'Cache-Control': 'no-store, max-age=600', 'ETag': '"v1"'}, b'<p>v1</p>')
+    fetch('/p')
+    fetch('/p')
+    assert site.hits('/p') == 2
+    assert 'If-None-Match' not in site.requests[-1][1]
+
+
+def test_no_cache_is_revalidated_every_time(site, fetch):
+    site.pages['/p'] = validated_page(b'<p>v1</p>', '"v1"', {'Cache-Control': 'no-cache'})
+    for _ in range(3):
+        assert fetch('/p').content == b'<p>v1</p>'
+    assert site.hits('/p') == 3
+    assert [headers.get('If-None-Match') for _, headers in site.requests] == [None, '"v1"', '"v1"']
+
+
+def test_expires_header(site, fetch, clock):
+    site.pages['/p'] = (200, {'Expires': formatdate(clock.now + 120, usegmt=True)}, b'<p>v1</p>')
+    fetch('/p')
+    clock.advance(115)
+    fetch('/p')
+    assert site.hits('/p') == 1
+
+    # Expired without validators: fetched again in full
+    clock.advance(10)
+    fetch('/p')
+    assert site.hits('/p') == 2
+
+
+def test_last_modified_heuristic(site, fetch, clock):
+    last_modified = formatdate(clock.now - 1000, usegmt=True)
+
+    def page(request_headers):
+        if request_headers.get('If-Modified-Since') == last_modified:
+            return 304, {'Last-Modified': last_modified}, b''
+        return 200, {'Last-Modified': last_modified}, b'<p>v1</p>'
+    site.pages['/p'] = page
+
+    # Fresh for a tenth of its age
+    fetch('/p')
+    clock.advance(95)
+    fetch('/p')
+    assert site.hits('/p') == 1
+
+    clock.advance(10)
+    assert fetch('/p').content == b'<p>v1</p>'
+    assert site.hits('/p') == 2
+    assert site.requests[-1][1].get('If-Modified-Since') == last_modified
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), max_bytes=250)
+    cache.evict_interval = 1
+    headers = {'Cache-Control': 'max-age=600'}
+
+    cache.store('https://shop.example.com/a', headers, b'a' * 100)
+    clock.advance(1)
+    cache.store('https://shop.example.com/b', headers, b'b' * 100)
+    clock.advance(1)
+    assert cache.get('https://shop.example.com/a') is not None  # Now more recent than b
+    clock.advance(1)
+    cache.store('https://shop.example.com/c', headers, b'c' * 100)
+
+    assert cache.get('https://shop.example.com/b') is None
+    assert cache.get('https://shop.example.com/a').content == b'a' * 100
+    assert cache.get('https://shop.example.com/c').content == b'c' * 100
+
+
+def test_entries_older_than_max_age_are_dropped(tmp_path, clock):
+    cache = ResponseCache(str(tmp_path / 'responses.sqlite'), max_age=3600)
+    cache.store('https://shop.example.com/a', {'ETag': '"a"', 'Cache-Control': 'max-age=86400'}, b'a')
+    clock.advance(3599)
+    assert cache.get('https://shop.example.com/a') is not None
+    clock.advance(2)
+    assert cache.get('https://shop.example.com/a') is None
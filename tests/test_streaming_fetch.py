@@ -0,0 +1,43 @@
+"""Streaming page downloads on both fetch engines, with and without a charset in Content-Type."""
+import pytest
+
+from scraper import AIOHTTP_AVAILABLE, FETCH_ENGINES, ProductScraper, ScraperCore
+
+NAME = 'Café Crème Deluxe Espresso Maker'
+PAGE = ('<html><head><title>Shop</title></head><body>'
+        f'<h1 class="product-title">{NAME}</h1>'
+        '<span class="price">€129.99</span>'
+        '<div class="availability">In stock</div>'
+        f'<div class="description">{"A sturdy machine for the kitchen counter. " * 200}</div>'
+        '</body></html>').encode('utf-8')
+CONTENT_TYPES = {
+    '/charset': 'text/html; charset=utf-8',
+    '/xhtml': 'application/xhtml+xml',
+    '/no-content-type': None,
+}
+
+
+@pytest.fixture(params=FETCH_ENGINES)
+def scraper(request):
+    if request.param == 'asyncio' and not AIOHTTP_AVAILABLE:
+        pytest.skip('aiohttp is not installed')
+    scraper = ProductScraper(fetch_engine=request.param, core=ScraperCore(None, refresh_domain_catalog=False))
+    scraper.streaming_fetch = True
+    scraper.stream_chunk_size = 1024
+    scraper.max_retries = 1
+    return scraper
+
+
+@pytest.mark.parametrize('budget', (len(PAGE), 2048))
+def test_streamed_pages_scrape_with_any_content_type(site, scraper, budget):
+    scraper.stream_byte_budget = budget
+    for path, content_type in CONTENT_TYPES.items():
+        site.pages[path] = (200, {'Content-Type': content_type} if content_type else {}, PAGE)
+    search_results = [{'url': site.url(path), 'title': path, 'snippet': ''} for path in CONTENT_TYPES]
+
+    products = {product['product_url']: product for product in scraper.iter_scrape_products(search_results)}
+
+    assert set(products) == {result['url'] for result in search_results}
+    for product in products.values():
+        assert product['name'] == NAME
+        assert product['price'] == '€129.99'
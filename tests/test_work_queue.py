@@ -0,0 +1,180 @@
+"""Lease semantics of the work queue backends.
+
+Each test runs against MemoryWorkQueue, SQLiteWorkQueue and RedisWorkQueue (on
+fakeredis, skipped when it or its Lua support is not installed). The clock is
+faked, so lease expiry and retry backoff need no sleeping.
+"""
+import time
+
+import pytest
+
+from work_queue import JOB_STATES, MemoryWorkQueue, RedisWorkQueue, SQLiteWorkQueue, job_id, open_queue
+
+BACKENDS = ('memory', 'sqlite', 'redis')
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(time, 'time', clock)
+    return clock
+
+
+@pytest.fixture(params=BACKENDS)
+def make_queue(request, tmp_path, clock):
+    """Factory for an empty queue of the parametrized backend"""
+    if request.param == 'redis':
+        fakeredis = pytest.importorskip('fakeredis')
+        pytest.importorskip('lupa')
+        server = fakeredis.FakeServer()
+
+    def make(**options):
+        if request.param == 'memory':
+            return MemoryWorkQueue(**options)
+        if request.param == 'sqlite':
+            return SQLiteWorkQueue(str(tmp_path / 'queue.sqlite'), **options)
+        return RedisWorkQueue(client=fakeredis.FakeRedis(server=server), **options)
+    return make
+
+
+def stats(**expected):
+    return dict(dict.fromkeys(JOB_STATES, 0), **expected)
+
+
+def test_enqueue_skips_canonical_duplicates(make_queue):
+    work_queue = make_queue()
+    added = work_queue.enqueue([
+        {'url': 'https://Shop.example.com/item?b=2&a=1'},
+        {'url': 'https://shop.example.com:443/item?a=1&b=2&utm_source=ads#reviews'},
+    ])
+    assert added == 1
+    assert work_queue.enqueue([{'url': 'https://shop.example.com/item?a=1&b=2'}]) == 0
+    assert work_queue.get_stats() == stats(pending=1)
+
+    (job,) = work_queue.lease(5, 60)
+    assert job.id == job_id('https://shop.example.com/item?a=1&b=2')
+    assert job.payload['url'] == 'https://Shop.example.com/item?b=2&a=1'
+    assert job.attempts == 1
+
+
+def test_lease_hands_each_job_to_one_worker(make_queue):
+    work_queue = make_queue()
+    work_queue.enqueue({'url': f"https://shop.example.com/p{i}"} for i in range(5))
+
+    first = work_queue.lease(3, 60)
+    second = work_queue.lease(3, 60)
+    assert len(first) == 3 and len(second) == 2
+    assert not {job.id for job in first} & {job.id for job in second}
+    assert work_queue.lease(3, 60) == []
+    assert work_queue.get_stats() == stats(leased=5)
+
+
+def test_expired_lease_is_reclaimed(make_queue, clock):
+    work_queue = make_queue()
+    work_queue.enqueue([{'url': 'https://shop.example.com/p'}])
+
+    (job,) = work_queue.lease(1, 30)
+    clock.advance(29)
+    assert work_queue.lease(1, 30) == []
+
+    clock.advance(2)
+    (again,) = work_queue.lease(1, 30)
+    assert again.id == job.id
+    assert again.attempts == 2
+    assert again.token != job.token
+
+
+def test_stale_token_cannot_release_reassigned_job(make_queue, clock):
+    work_queue = make_queue()
+    work_queue.enqueue([{'url': 'https://shop.example.com/p'}])
+    (stale,) = work_queue.lease(1, 30)
+    clock.advance(31)
+    (current,) = work_queue.lease(1, 30)
+
+    assert work_queue.fail(stale, 'timeout') is False
+    assert work_queue.complete(stale, {'name': 'stale'}) is False
+    assert work_queue.get_stats() == stats(leased=1)
+    assert list(work_queue.iter_results()) == []
+
+    assert work_queue.complete(current, {'name': 'current'}) is True
+    assert work_queue.complete(current, {'name': 'again'}) is False
+    assert work_queue.get_stats() == stats(done=1)
+    assert list(work_queue.iter_results()) == [{'name': 'current'}]
+
+
+def test_failed_job_is_retried_with_backoff(make_queue, clock):
+    work_queue = make_queue(retry_delay=10)
+    work_queue.enqueue([{'url': 'https://shop.example.com/p'}])
+
+    (job,) = work_queue.lease(1, 60)
+    assert work_queue.fail(job, 'HTTP 503') is True
+    assert work_queue.get_stats() == stats(pending=1)
+    clock.advance(9)
+    assert work_queue.lease(1, 60) == []
+    clock.advance(1)
+    (job,) = work_queue.lease(1, 60)
+
+    # The delay doubles with each attempt
+    assert work_queue.fail(job, 'HTTP 503') is True
+    clock.advance(19)
+    assert work_queue.lease(1, 60) == []
+    clock.advance(1)
+    assert len(work_queue.lease(1, 60)) == 1
+
+
+def test_max_attempts_marks_job_failed(make_queue, clock):
+    work_queue = make_queue(max_attempts=2, retry_delay=0)
+    work_queue.enqueue([{'url': 'https://shop.example.com/a'}, {'url': 'https://shop.example.com/b'}])
+
+    for job in work_queue.lease(2, 60):
+        work_queue.fail(job, 'no product scraped')
+    clock.advance(1)
+    jobs = work_queue.lease(2, 60)
+    assert [job.attempts for job in jobs] == [2, 2]
+
+    # One exhausts its attempts by failing, the other by losing its lease
+    work_queue.fail(jobs[0], 'no product scraped')
+    clock.advance(61)
+    assert work_queue.lease(2, 60) == []
+    assert work_queue.get_stats() == stats(failed=2)
+
+
+def test_requeue_resets_finished_jobs_only(make_queue, clock):
+    work_queue = make_queue(max_attempts=1)
+    work_queue.enqueue([{'url': f"https://shop.example.com/{name}"} for name in ('done', 'failed', 'leased')])
+    jobs = {job.payload['url'].rsplit('/', 1)[1]: job for job in work_queue.lease(3, 60)}
+    done, failed, leased = jobs['done'], jobs['failed'], jobs['leased']
+    work_queue.enqueue([{'url': 'https://shop.example.com/pending'}])
+    work_queue.complete(done, {'name': 'done'})
+    work_queue.fail(failed, 'HTTP 404')
+    assert work_queue.get_stats() == stats(pending=1, leased=1, done=1, failed=1)
+
+    assert work_queue.enqueue([{'url': f"https://shop.example.com/{name}"} for name in ('done', 'failed')]) == 0
+    added = work_queue.enqueue([{'url': f"https://shop.example.com/{name}"} for name in ('done', 'failed', 'leased', 'pending')],
+                               requeue=True)
+    assert added == 2
+    assert work_queue.get_stats() == stats(pending=3, leased=1)
+
+    jobs = work_queue.lease(5, 60)
+    assert {job.id for job in jobs} == {done.id, failed.id, job_id('https://shop.example.com/pending')}
+    assert all(job.attempts == 1 for job in jobs)
+    assert work_queue.complete(leased, {'name': 'leased'}) is True
+
+
+def test_open_queue_specs(tmp_path):
+    assert isinstance(open_queue('memory://'), MemoryWorkQueue)
+    work_queue = open_queue(f"sqlite:///{tmp_path / 'queue.sqlite'}", max_attempts=5)
+    assert isinstance(work_queue, SQLiteWorkQueue)
+    assert work_queue.path == str(tmp_path / 'queue.sqlite')
+    assert work_queue.max_attempts == 5
@@ -0,0 +1,642 @@
+"""Distributed scraping: a shared work queue of product pages and the workers that drain it.
+
+    python work_queue.py --queue redis://queue-host:6379/0 enqueue urls.txt
+    python work_queue.py --queue redis://queue-host:6379/0 enqueue queries.txt --search
+    python work_queue.py --queue redis://queue-host:6379/0 worker     # on every node
+    python work_queue.py --queue redis://queue-host:6379/0 status
+    python work_queue.py --queue redis://queue-host:6379/0 export -o products.jsonl
+
+Without --queue a SQLite queue in the cache directory is used, which is enough
+for several worker processes on one machine.
+
+Workers lease jobs for a limited time. A job whose worker dies goes back to the
+queue when its lease runs out, and a failed scrape is retried with backoff up to
+max_attempts times. Products are written back to the queue's result store.
+
+Backends: SQLiteWorkQueue for processes on one machine, RedisWorkQueue (needs the
+redis package) for workers on several hosts, and MemoryWorkQueue for tests. Per-host
+politeness limits apply per worker process.
+"""
+import argparse
+import concurrent.futures
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from scraper import DEFAULT_CACHE_DIR, ProductScraper, canonicalize_url, get_shared_core
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+JOB_STATES = ('pending', 'leased', 'done', 'failed')
+DEFAULT_QUEUE = f"sqlite:///{os.path.join(DEFAULT_CACHE_DIR, 'work_queue.sqlite')}"
+
+
+def job_id(url: str) -> str:
+    """Stable job id of a URL; near-identical URLs share one job"""
+    return hashlib.sha1(canonicalize_url(url).encode()).hexdigest()
+
+
+class Job:
+    """A leased job. payload is the search result to scrape and holds at least a url"""
+    __slots__ = ('id', 'payload', 'attempts', 'token')
+
+    def __init__(self, id: str, payload: Dict, attempts: int, token: str):
+        self.id = id
+        self.payload = payload
+        self.attempts = attempts
+        self.token = token
+
+    def __repr__(self):
+        return f"Job({self.id!r}, {self.payload.get('url')!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Interface of the work queue backends.
+
+    A job is leased to one worker at a time; the lease counts as an attempt. Jobs
+    whose lease runs out and failed jobs go back to pending, after retry_delay
+    doubling per attempt, until max_attempts have been used up.
+    """
+
+    def __init__(self, max_attempts: int = 3, retry_delay: float = 30):
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def enqueue(self, payloads: Iterable[Dict], requeue: bool = False) -> int:
+        """Add scrape jobs and return how many were added. Known URLs are skipped unless
+        requeue is set, which also resets finished and failed jobs for a refresh"""
+        raise NotImplementedError
+
+    def lease(self, count: int, lease_seconds: float) -> List[Job]:
+        """Take up to count jobs that are due, reclaiming expired leases first"""
+        raise NotImplementedError
+
+    def complete(self, job: Job, product: Dict) -> bool:
+        """Store the product of a job and mark it done. Returns False if the lease had already been lost"""
+        raise NotImplementedError
+
+    def fail(self, job: Job, error: str) -> bool:
+        """Release a job after a failed attempt. Returns False if the lease had already been lost"""
+        raise NotImplementedError
+
+    def iter_results(self) -> Iterator[Dict]:
+        raise NotImplementedError
+
+    def get_stats(self) -> Dict[str, int]:
+        """Number of jobs in each state"""
+        raise NotImplementedError
+
+    def _retry_at(self, attempts: int) -> float:
+        return time.time() + self.retry_delay * 2 ** max(attempts - 1, 0)
+
+
+class MemoryWorkQueue(WorkQueue):
+    """In-process queue with the same semantics as the shared backends, for tests"""
+
+    def __init__(self, max_attempts: int = 3, retry_delay: float = 30):
+        super().__init__(max_attempts, retry_delay)
+        self._jobs = {}  # id -> dict(payload, state, attempts, available_at, token, lease_until, error)
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, payloads: Iterable[Dict], requeue: bool = False) -> int:
+        added = 0
+        now = time.time()
+        with self._lock:
+            for payload in payloads:
+                key = job_id(payload['url'])
+                job = self._jobs.get(key)
+                if job is not None and not (requeue and job['state'] in ('done', 'failed')):
+                    continue
+                self._jobs[key] = {'payload': dict(payload), 'state': 'pending', 'attempts': 0, 'available_at': now,
+                                  'token': None, 'lease_until': 0.0, 'error': None}
+                added += 1
+        return added
+
+    def lease(self, count: int, lease_seconds: float) -> List[Job]:
+        now = time.time()
+        leased = []
+        with self._lock:
+            for job in self._jobs.values():
+                if job['state'] == 'leased' and job['lease_until'] < now:
+                    job['error'] = 'lease expired'
+                    job['state'] = 'failed' if job['attempts'] >= self.max_attempts else 'pending'
+                    job['available_at'] = now
+
+            due = sorted((job['available_at'], key) for key, job in self._jobs.items()
+                         if job['state'] == 'pending' and job['available_at'] <= now)
+            for _, key in due[:count]:
+                job = self._jobs[key]
+                job['state'] = 'leased'
+                job['attempts'] += 1
+                job['token'] = uuid.uuid4().hex
+                job['lease_until'] = now + lease_seconds
+                leased.append(Job(key, dict(job['payload']), job['attempts'], job['token']))
+        return leased
+
+    def complete(self, job: Job, product: Dict) -> bool:
+        with self._lock:
+            record = self._jobs[job.id]
+            if record['state'] != 'leased' or record['token'] != job.token:
+                return False
+            self._results[job.id] = dict(product)
+            record.update(state='done', token=None, error=None)
+            return True
+
+    def fail(self, job: Job, error: str) -> bool:
+        with self._lock:
+            record = self._jobs[job.id]
+            if record['state'] != 'leased' or record['token'] != job.token:
+                return False
+            record.update(token=None, error=error)
+            if record['attempts'] >= self.max_attempts:
+                record['state'] = 'failed'
+            else:
+                record['state'] = 'pending'
+                record['available_at'] = self._retry_at(record['attempts'])
+            return True
+
+    def iter_results(self) -> Iterator[Dict]:
+        with self._lock:
+            results = list(self._results.values())
+        return iter(results)
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict.fromkeys(JOB_STATES, 0)
+        with self._lock:
+            for job in self._jobs.values():
+                stats[job['state']] += 1
+        return stats
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """Work queue in a SQLite file, shared by worker processes on one machine.
+
+    Leases are taken inside BEGIN IMMEDIATE transactions, so concurrent workers
+    never get the same job. Avoid network file systems, where SQLite locking is
+    unreliable; use RedisWorkQueue across hosts.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3, retry_delay: float = 30):
+        super().__init__(max_attempts, retry_delay)
+        self.path = path
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30, isolation_level=None)
+        with self._lock:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    attempts INTEGER NOT NULL,
+                    available_at REAL NOT NULL,
+                    lease_token TEXT,
+                    lease_until REAL,
+                    error TEXT
+                )
+            """)
+            self._conn.execute('CREATE INDEX IF NOT EXISTS jobs_due ON jobs (state, available_at)')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    id TEXT PRIMARY KEY,
+                    product TEXT NOT NULL,
+                    completed_at REAL NOT NULL
+                )
+            """)
+
+    def _transaction(self, work):
+        """Run work(conn) in a write transaction under the connection lock"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = work(self._conn)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            return result
+
+    def enqueue(self, payloads: Iterable[Dict], requeue: bool = False) -> int:
+        now = time.time()
+        rows = [(job_id(payload['url']), json.dumps(payload), now) for payload in payloads]
+        if requeue:
+            sql = """
+                INSERT INTO jobs VALUES (?, ?, 'pending', 0, ?, NULL, NULL, NULL)
+                ON CONFLICT (id) DO UPDATE SET payload = excluded.payload, state = 'pending', attempts = 0,
+                    available_at = excluded.available_at, lease_token = NULL, error = NULL
+                WHERE jobs.state IN ('done', 'failed')
+            """
+        else:
+            sql = "INSERT OR IGNORE INTO jobs VALUES (?, ?, 'pending', 0, ?, NULL, NULL, NULL)"
+
+        def work(conn):
+            before = conn.total_changes
+            conn.executemany(sql, rows)
+            return conn.total_changes - before
+        return self._transaction(work)
+
+    def lease(self, count: int, lease_seconds: float) -> List[Job]:
+        def work(conn):
+            now = time.time()
+            conn.execute("""
+                UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                    available_at = ?, lease_token = NULL, error = 'lease expired'
+                WHERE state = 'leased' AND lease_until < ?
+            """, (self.max_attempts, now, now))
+
+            rows = conn.execute(
+                "SELECT id, payload, attempts FROM jobs WHERE state = 'pending' AND available_at <= ? ORDER BY available_at LIMIT ?",
+                (now, count)
+            ).fetchall()
+            jobs = [Job(key, json.loads(payload), attempts + 1, uuid.uuid4().hex) for key, payload, attempts in rows]
+            conn.executemany(
+                "UPDATE jobs SET state = 'leased', attempts = ?, lease_token = ?, lease_until = ? WHERE id = ?",
+                [(job.attempts, job.token, now + lease_seconds, job.id) for job in jobs]
+            )
+            return jobs
+        return self._transaction(work)
+
+    def complete(self, job: Job, product: Dict) -> bool:
+        def work(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', lease_token = NULL, error = NULL "
+                "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                (job.id, job.token)
+            )
+            if cursor.rowcount == 0:
+                return False
+            conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', (job.id, json.dumps(product), time.time()))
+            return True
+        return self._transaction(work)
+
+    def fail(self, job: Job, error: str) -> bool:
+        failed = job.attempts >= self.max_attempts
+
+        def work(conn):
+            cursor = conn.execute(
+                "UPDATE jobs SET state = ?, available_at = ?, lease_token = NULL, error = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                ('failed' if failed else 'pending', self._retry_at(job.attempts), error, job.id, job.token)
+            )
+            return cursor.rowcount > 0
+        return self._transaction(work)
+
+    def iter_results(self) -> Iterator[Dict]:
+        with self._lock:
+            rows = self._conn.execute('SELECT product FROM results ORDER BY completed_at').fetchall()
+        for (product,) in rows:
+            yield json.loads(product)
+
+    def get_stats(self) -> Dict[str, int]:
+        stats = dict.fromkeys(JOB_STATES, 0)
+        with self._lock:
+            stats.update(self._conn.execute('SELECT state, COUNT(*) FROM jobs GROUP BY state').fetchall())
+        return stats
+
+
+class RedisWorkQueue(WorkQueue):
+    """Work queue in Redis (or a Redis-compatible server), shared by workers on any number of hosts.
+
+    Due jobs sit in a sorted set scored by availability time and leased ones in a
+    sorted set scored by lease expiry. Leasing and releasing run as Lua scripts, so
+    each is atomic on the server. Needs a single-node server: the scripts touch
+    per-job keys they cannot declare up front.
+    """
+
+    ENQUEUE_SCRIPT = """
+        local prefix, now, requeue = ARGV[1], ARGV[2], ARGV[3]
+        local added = 0
+        for i = 4, #ARGV, 2 do
+            local id = ARGV[i]
+            local key = prefix .. 'job:' .. id
+            local state = redis.call('HGET', key, 'state')
+            if not state or (requeue == '1' and (state == 'done' or state == 'failed')) then
+                redis.call('HSET', key, 'payload', ARGV[i + 1], 'state', 'pending', 'attempts', 0, 'token', '', 'error', '')
+                redis.call('ZADD', prefix .. 'pending', now, id)
+                redis.call('SREM', prefix .. 'done', id)
+                redis.call('SREM', prefix .. 'failed', id)
+                added = added + 1
+            end
+        end
+        return added
+    """
+
+    LEASE_SCRIPT = """
+        local prefix, now, count, lease_until, max_attempts = ARGV[1], tonumber(ARGV[2]), tonumber(ARGV[3]), ARGV[4], tonumber(ARGV[5])
+        for _, id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. 'leased', '-inf', now)) do
+            local key = prefix .. 'job:' .. id
+            redis.call('ZREM', prefix .. 'leased', id)
+            redis.call('HSET', key, 'token', '', 'error', 'lease expired')
+            if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+                redis.call('HSET', key, 'state', 'failed')
+                redis.call('SADD', prefix .. 'failed', id)
+            else
+                redis.call('HSET', key, 'state', 'pending')
+                redis.call('ZADD', prefix .. 'pending', now, id)
+            end
+        end
+
+        local leased = {}
+        for i, id in ipairs(redis.call('ZRANGEBYSCORE', prefix .. 'pending', '-inf', now, 'LIMIT', 0, count)) do
+            local key = prefix .. 'job:' .. id
+            local token = ARGV[5 + i]
+            redis.call('ZREM', prefix .. 'pending', id)
+            redis.call('ZADD', prefix .. 'leased', lease_until, id)
+            local attempts = redis.call('HINCRBY', key, 'attempts', 1)
+            redis.call('HSET', key, 'state', 'leased', 'token', token)
+            table.insert(leased, id)
+            table.insert(leased, redis.call('HGET', key, 'payload'))
+            table.insert(leased, attempts)
+            table.insert(leased, token)
+        end
+        return leased
+    """
+
+    FAIL_SCRIPT = """
+        local prefix, id, token, error, retry_at, max_attempts = ARGV[1], ARGV[2], ARGV[3], ARGV[4], ARGV[5], tonumber(ARGV[6])
+        local key = prefix .. 'job:' .. id
+        if redis.call('HGET', key, 'state') ~= 'leased' or redis.call('HGET', key, 'token') ~= token then
+            return 0
+        end
+        redis.call('ZREM', prefix .. 'leased', id)
+        redis.call('HSET', key, 'token', '', 'error', error)
+        if tonumber(redis.call('HGET', key, 'attempts')) >= max_attempts then
+            redis.call('HSET', key, 'state', 'failed')
+            redis.call('SADD', prefix .. 'failed', id)
+        else
+            redis.call('HSET', key, 'state', 'pending')
+            redis.call('ZADD', prefix .. 'pending', retry_at, id)
+        end
+        return 1
+    """
+
+    COMPLETE_SCRIPT = """
+        local prefix, id, token, product = ARGV[1], ARGV[2], ARGV[3], ARGV[4]
+        local key = prefix .. 'job:' .. id
+        if redis.call('HGET', key, 'state') ~= 'leased' or redis.call('HGET', key, 'token') ~= token then
+            return 0
+        end
+        redis.call('ZREM', prefix .. 'leased', id)
+        redis.call('HSET', prefix .. 'results', id, product)
+        redis.call('HSET', key, 'state', 'done', 'token', '', 'error', '')
+        redis.call('SADD', prefix .. 'done', id)
+        return 1
+    """
+
+    def __init__(self, url: str = None, prefix: str = 'smartscrape:', max_attempts: int = 3, retry_delay: float = 30,
+                 client=None):
+        super().__init__(max_attempts, retry_delay)
+        if client is None:
+            if not REDIS_AVAILABLE:
+                raise RuntimeError("The Redis work queue needs the redis package. Install with: pip install redis")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._enqueue = client.register_script(self.ENQUEUE_SCRIPT)
+        self._lease = client.register_script(self.LEASE_SCRIPT)
+        self._fail = client.register_script(self.FAIL_SCRIPT)
+        self._complete = client.register_script(self.COMPLETE_SCRIPT)
+
+    def enqueue(self, payloads: Iterable[Dict], requeue: bool = False, chunk_size: int = 500) -> int:
+        added = 0
+        payloads = iter(payloads)
+        while True:
+            args = []
+            for payload in islice(payloads, chunk_size):
+                args += [job_id(payload['url']), json.dumps(payload)]
+            if not args:
+                return added
+            added += self._enqueue(args=[self.prefix, time.time(), int(requeue)] + args)
+
+    def lease(self, count: int, lease_seconds: float) -> List[Job]:
+        if count <= 0:
+            return []
+        now = time.time()
+        tokens = [uuid.uuid4().hex for _ in range(count)]
+        flat = self._lease(args=[self.prefix, now, count, now + lease_seconds, self.max_attempts] + tokens)
+        return [
+            Job(self._text(flat[i]), json.loads(flat[i + 1]), int(flat[i + 2]), self._text(flat[i + 3]))
+            for i in range(0, len(flat), 4)
+        ]
+
+    def complete(self, job: Job, product: Dict) -> bool:
+        return bool(self._complete(args=[self.prefix, job.id, job.token, json.dumps(product)]))
+
+    def fail(self, job: Job, error: str) -> bool:
+        return bool(self._fail(args=[self.prefix, job.id, job.token, error, self._retry_at(job.attempts), self.max_attempts]))
+
+    def iter_results(self) -> Iterator[Dict]:
+        for _, product in self.client.hscan_iter(f"{self.prefix}results"):
+            yield json.loads(product)
+
+    def get_stats(self) -> Dict[str, int]:
+        pipe = self.client.pipeline()
+        pipe.zcard(f"{self.prefix}pending")
+        pipe.zcard(f"{self.prefix}leased")
+        pipe.scard(f"{self.prefix}done")
+        pipe.scard(f"{self.prefix}failed")
+        return dict(zip(JOB_STATES, pipe.execute()))
+
+    @staticmethod
+    def _text(value) -> str:
+        return value.decode() if isinstance(value, bytes) else value
+
+
+def open_queue(spec: str, **options) -> WorkQueue:
+    """Work queue from a spec: redis://host:port/db, memory://, or sqlite:///relative/path and
+    sqlite:////absolute/path (a plain file path works too)"""
+    if spec.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisWorkQueue(spec, **options)
+    if spec.startswith('memory://'):
+        return MemoryWorkQueue(**options)
+    return SQLiteWorkQueue(spec[len('sqlite:///'):] if spec.startswith('sqlite:///') else spec, **options)
+
+
+class QueueWorker:
+    """Leases scrape jobs from a WorkQueue and writes the products back to it"""
+
+    def __init__(self, work_queue: WorkQueue, scraper: Optional[ProductScraper] = None, concurrency: int = 8,
+                 lease_seconds: float = 120, poll_interval: float = 2.0):
+        self.work_queue = work_queue
+        self.scraper = scraper or ProductScraper(core=get_shared_core())
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds  # Keep well above the time a scrape can take with its retries
+        self.poll_interval = poll_interval
+        self.stats = {'done': 0, 'failed': 0}
+        self._stats_lock = threading.Lock()
+
+    def run(self, stop: Optional[threading.Event] = None, exit_when_idle: bool = False) -> Dict[str, int]:
+        """Process jobs until stop is set, or until the queue has nothing left if exit_when_idle"""
+        stop = stop or threading.Event()
+        in_flight = set()
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency)
+        try:
+            while not stop.is_set():
+                # Lease only what the free threads can start now, so leases do not tick away in a backlog
+                free = self.concurrency - len(in_flight)
+                try:
+                    jobs = self.work_queue.lease(free, self.lease_seconds) if free else []
+                except Exception as e:
+                    # e.g. a dropped Redis connection or a locked SQLite file; try again after a pause
+                    logger.error(f"Could not lease jobs: {e}")
+                    jobs = []
+                    if not in_flight:
+                        stop.wait(self.poll_interval)
+                        continue
+                in_flight.update(executor.submit(self._process, job) for job in jobs)
+
+                if not in_flight:
+                    if exit_when_idle and not self._has_work():
+                        break
+                    stop.wait(self.poll_interval)
+                    continue
+                done, in_flight = concurrent.futures.wait(in_flight, timeout=self.poll_interval,
+                                                          return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception():
+                        # e.g. the queue was unreachable; the job comes back when its lease expires
+                        logger.error(f"Work queue error: {future.exception()}")
+        finally:
+            # Unstarted jobs are simply left to their leases
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+        return dict(self.stats)
+
+    def _has_work(self) -> bool:
+        try:
+            stats = self.work_queue.get_stats()
+        except Exception as e:
+            logger.error(f"Could not read queue status: {e}")
+            return True  # Keep polling until the queue answers
+        # Leases held by other workers may still expire and come back
+        return bool(stats['pending'] or stats['leased'])
+
+    def _process(self, job: Job):
+        url = job.payload['url']
+        try:
+            product = self.scraper.scrape_product_page_enhanced(url)
+            error = 'no product scraped'
+        except Exception as e:
+            product = None
+            error = str(e)
+
+        if product is None:
+            self.work_queue.fail(job, error)
+            logger.warning(f"✗ Job {job.id[:12]} failed (attempt {job.attempts}/{self.work_queue.max_attempts}): {url[:60]}")
+            self._count('failed')
+            return
+
+        product.search_title = job.payload.get('title')
+        product.search_snippet = job.payload.get('snippet')
+        product.search_region = job.payload.get('region', 'unknown')
+        product.search_source = job.payload.get('source', 'work_queue')
+        record = product.to_dict()
+        if job.payload.get('query'):
+            record['query'] = job.payload['query']
+        if not self.work_queue.complete(job, record):
+            # The lease ran out and the job went to another worker, whose result counts
+            logger.warning(f"Lease of job {job.id[:12]} was lost before it finished; result dropped: {url[:60]}")
+            return
+        logger.info(f"✓ Job {job.id[:12]} done: {product.name[:50]}")
+        self._count('done')
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.stats[outcome] += 1
+
+
+def _read_lines(path: str) -> List[str]:
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scrape product pages from a work queue shared by many workers.")
+    parser.add_argument('--queue', default=DEFAULT_QUEUE, help=f"sqlite:///path, redis://host:port/db (default: {DEFAULT_QUEUE})")
+    parser.add_argument('--max-attempts', type=int, default=3, help="attempts per job before it is marked failed (default: 3)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="only log warnings and errors")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue = commands.add_parser('enqueue', help="add product page URLs, or the search results of queries, to the queue")
+    enqueue.add_argument('file', help="file with one URL (or query, with --search) per line")
+    enqueue.add_argument('--search', action='store_true', help="treat lines as search queries and enqueue their results")
+    enqueue.add_argument('--category', default='general')
+    enqueue.add_argument('-n', '--max-results', type=int, default=100, help="search results per query (default: 100)")
+    enqueue.add_argument('--requeue', action='store_true', help="scrape finished and failed URLs again")
+
+    worker = commands.add_parser('worker', help="lease and scrape jobs until stopped")
+    worker.add_argument('-w', '--workers', type=int, default=8, help="concurrent scrapes (default: 8)")
+    worker.add_argument('--lease', type=float, default=120, help="seconds a leased job is reserved (default: 120)")
+    worker.add_argument('--exit-when-idle', action='store_true', help="stop once the queue has no pending or leased jobs")
+    worker.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help=f"cache directory (default: {DEFAULT_CACHE_DIR})")
+
+    commands.add_parser('status', help="print the number of jobs in each state")
+
+    export = commands.add_parser('export', help="write the stored products as JSONL")
+    export.add_argument('-o', '--output', help="output file (default: standard output)")
+
+    args = parser.parse_args(argv)
+    if args.quiet:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    try:
+        work_queue = open_queue(args.queue, max_attempts=args.max_attempts)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 2
+
+    if args.command == 'enqueue':
+        lines = _read_lines(args.file)
+        if not args.search:
+            added = work_queue.enqueue(({'url': url} for url in lines), requeue=args.requeue)
+        else:
+            scraper = ProductScraper(core=get_shared_core())
+            added = 0
+            for query in lines:
+                results = [dict(result, query=query) for result in scraper.search_products_multi_region(query, args.category, args.max_results)]
+                added += work_queue.enqueue(results, requeue=args.requeue)
+        logger.info(f"Enqueued {added} jobs: {work_queue.get_stats()}")
+
+    elif args.command == 'worker':
+        scraper = ProductScraper(core=get_shared_core(args.cache_dir))
+        scraper.image_mode = 'lazy'  # Only image URLs are stored
+        try:
+            stats = QueueWorker(work_queue, scraper, concurrency=args.workers, lease_seconds=args.lease).run(exit_when_idle=args.exit_when_idle)
+        except KeyboardInterrupt:
+            return 130
+        logger.info(f"Worker finished: {stats['done']} done, {stats['failed']} failed attempts")
+
+    elif args.command == 'status':
+        print(json.dumps(work_queue.get_stats()))
+
+    elif args.command == 'export':
+        output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        try:
+            for product in work_queue.iter_results():
+                output.write(json.dumps(product, ensure_ascii=False) + '\n')
+        finally:
+            if output is not sys.stdout:
+                output.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())